@@ -6,6 +6,7 @@ Complete automation system for customer support, appointment management, and mor
 from .workflow_engine import (
     WorkflowEngine,
     Workflow,
+    WorkflowHistory,
     WorkflowTask,
     WorkflowStatus,
     Customer,
@@ -14,7 +15,10 @@ from .workflow_engine import (
     SupportTicket,
     SupportTicketStatus,
     EmailService,
+    SMTPConnectionPool,
     SMSService,
+    AsyncEmailService,
+    AsyncSMSService,
     SendAppointmentConfirmationTask,
     SendAppointmentReminderTask,
     ResolveSupportTicketTask,
@@ -31,10 +35,16 @@ from .scheduler import (
     MaintenanceScheduler,
 )
 
+from .job_store import (
+    JobStore,
+    SQLiteJobStore,
+)
+
 __all__ = [
     # Workflow Engine
     'WorkflowEngine',
     'Workflow',
+    'WorkflowHistory',
     'WorkflowTask',
     'WorkflowStatus',
     'Customer',
@@ -43,7 +53,10 @@ __all__ = [
     'SupportTicket',
     'SupportTicketStatus',
     'EmailService',
+    'SMTPConnectionPool',
     'SMSService',
+    'AsyncEmailService',
+    'AsyncSMSService',
     'SendAppointmentConfirmationTask',
     'SendAppointmentReminderTask',
     'ResolveSupportTicketTask',
@@ -56,6 +69,9 @@ __all__ = [
     'ReminderScheduler',
     'FollowUpScheduler',
     'MaintenanceScheduler',
+    # Job Stores
+    'JobStore',
+    'SQLiteJobStore',
 ]
 
 __version__ = '1.0.0'
@@ -0,0 +1,567 @@
+"""
+Performance benchmarks for the Dental Practice Automation System
+Run with: python -m automation.benchmarks
+"""
+
+import asyncio
+import dataclasses
+import logging
+import os
+import smtplib
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from automation.scheduler import TaskScheduler, ScheduledTask, ScheduleType
+from automation.job_store import SQLiteJobStore
+from automation.workflow_engine import (
+    EmailService, AsyncEmailService, aiosmtplib,
+    WorkflowEngine, Customer, Appointment, AppointmentStatus,
+    SupportTicket, SupportTicketStatus
+)
+
+
+def _noop():
+    pass
+
+
+class LocalSMTPServer:
+    """Minimal in-process SMTP sink standing in for a real mail server
+
+    Accepts EHLO, AUTH PLAIN and message delivery without TLS.
+    ``handshake_latency`` is added to EHLO and AUTH replies to model the
+    round trips a real server costs when opening a session, and
+    ``message_latency`` to each accepted message.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", handshake_latency: float = 0.02,
+                 message_latency: float = 0.0):
+        self.host = host
+        self.port = None
+        self.handshake_latency = handshake_latency
+        self.message_latency = message_latency
+        self.messages_received = 0
+        self.sessions_opened = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._sessions = set()
+
+    async def _handle(self, reader, writer):
+        self.sessions_opened += 1
+        self._sessions.add(writer)
+        try:
+            await self._converse(reader, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self._sessions.discard(writer)
+            writer.close()
+
+    async def _converse(self, reader, writer):
+        writer.write(b"220 localhost ESMTP stand-in\r\n")
+        in_data = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    if self.message_latency:
+                        await asyncio.sleep(self.message_latency)
+                    self.messages_received += 1
+                    writer.write(b"250 OK\r\n")
+                continue
+
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                await asyncio.sleep(self.handshake_latency)
+                writer.write(b"250-localhost\r\n250 AUTH PLAIN\r\n")
+            elif command == b"AUTH":
+                await asyncio.sleep(self.handshake_latency)
+                writer.write(b"235 Authentication successful\r\n")
+            elif command == b"DATA":
+                in_data = True
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+
+    def start(self) -> "LocalSMTPServer":
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, 0)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    async def _shutdown(self):
+        self._server.close()
+        for writer in list(self._sessions):
+            writer.close()
+        await self._server.wait_closed()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _build_tasks(count: int):
+    """Build tasks spread over the next week"""
+    now = datetime.now()
+    return [
+        ScheduledTask(
+            id=f"task_{i}",
+            name=f"Benchmark task {i}",
+            callback=_noop,
+            schedule_type=ScheduleType.ONCE,
+            execute_at=now + timedelta(days=1, seconds=(i * 37) % (6 * 86400))
+        )
+        for i in range(count)
+    ]
+
+
+async def benchmark_scheduler_loop(task_count: int = 100_000, idle_seconds: float = 5.0) -> dict:
+    """Measure scheduler loop CPU cost with many pending tasks"""
+    tasks = _build_tasks(task_count)
+    scheduler = TaskScheduler()
+
+    start = time.perf_counter()
+    for task in tasks:
+        scheduler.add_task(task)
+    add_seconds = time.perf_counter() - start
+
+    # Cost of the previous implementation: one full scan of every task per second
+    now = datetime.now()
+    start = time.process_time()
+    for _, task in list(scheduler.tasks.items()):
+        if not task.is_active:
+            continue
+        if now >= task.execute_at:
+            pass
+    full_scan_cpu = time.process_time() - start
+
+    await scheduler.start()
+    start = time.process_time()
+    await asyncio.sleep(idle_seconds)
+    loop_cpu = time.process_time() - start
+    await scheduler.stop()
+
+    start = time.perf_counter()
+    for task in tasks[: task_count // 2]:
+        scheduler.pause_task(task.id)
+    for task in tasks[: task_count // 2]:
+        scheduler.resume_task(task.id)
+    for task in tasks:
+        scheduler.remove_task(task.id)
+    mutate_seconds = time.perf_counter() - start
+
+    return {
+        'task_count': task_count,
+        'add_ops_per_sec': task_count / add_seconds,
+        'mutate_ops_per_sec': 2 * task_count / mutate_seconds,
+        'full_scan_cpu_per_second': full_scan_cpu,
+        'heap_loop_cpu_per_second': loop_cpu / idle_seconds,
+    }
+
+
+async def benchmark_concurrent_dispatch(task_count: int = 500, send_latency: float = 0.05,
+                                       max_concurrent_tasks: int = 50) -> dict:
+    """Measure wall time to drain a wave of due tasks, serial vs concurrent"""
+    timings = {}
+    for label, concurrency in (('serial', 1), ('concurrent', max_concurrent_tasks)):
+        scheduler = TaskScheduler(max_concurrent_tasks=concurrency)
+        done = asyncio.Event()
+        remaining = [task_count]
+
+        async def callback():
+            # Stand-in for an outbound send
+            await asyncio.sleep(send_latency)
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+        now = datetime.now()
+        for i in range(task_count):
+            scheduler.add_task(ScheduledTask(
+                id=f"wave_{i}",
+                name=f"Wave task {i}",
+                callback=callback,
+                schedule_type=ScheduleType.ONCE,
+                execute_at=now
+            ))
+
+        start = time.perf_counter()
+        await scheduler.start()
+        await done.wait()
+        timings[label] = time.perf_counter() - start
+        await scheduler.stop()
+
+    return {
+        'task_count': task_count,
+        'serial_seconds': timings['serial'],
+        'concurrent_seconds': timings['concurrent'],
+    }
+
+
+def benchmark_job_store_reload(task_count: int = 100_000) -> dict:
+    """Measure persisting and rehydrating scheduled jobs with SQLiteJobStore"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.db")
+
+        store = SQLiteJobStore(path)
+        scheduler = TaskScheduler(job_store=store)
+        tasks = _build_tasks(task_count)
+        for i, task in enumerate(tasks):
+            task.job_ref = "automation.benchmarks:_noop"
+            task.args = [f"apt_{i}", f"cust_{i}"]
+
+        start = time.perf_counter()
+        for task in tasks:
+            scheduler.add_task(task)
+        store.flush()
+        write_seconds = time.perf_counter() - start
+        store.close()
+
+        store = SQLiteJobStore(path)
+        scheduler = TaskScheduler(job_store=store)
+        start = time.perf_counter()
+        loaded = scheduler.load_jobs()
+        reload_seconds = time.perf_counter() - start
+        store.close()
+
+    return {
+        'task_count': loaded,
+        'write_seconds': write_seconds,
+        'reload_seconds': reload_seconds,
+    }
+
+
+def benchmark_email_delivery(message_count: int = 200, pool_size: int = 4) -> dict:
+    """Compare per-message SMTP sessions with pooled sessions and send_many"""
+    with LocalSMTPServer() as server:
+        service = EmailService(
+            server.host, server.port, "bench@example.com", "secret",
+            pool_size=pool_size, use_tls=False
+        )
+        messages = [
+            (f"patient{i}@example.com", "Appointment Reminder", "See you tomorrow", False)
+            for i in range(message_count)
+        ]
+
+        # Previous behaviour: connect and log in for every message
+        start = time.perf_counter()
+        for recipient, subject, body, html in messages:
+            msg = service._build_message(recipient, subject, body, html)
+            with smtplib.SMTP(server.host, server.port) as smtp:
+                smtp.login(service.sender_email, service.sender_password)
+                smtp.send_message(msg)
+        per_message_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for message in messages:
+            service.send_email(*message)
+        pooled_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        service.send_many(messages)
+        send_many_seconds = time.perf_counter() - start
+
+        service.close()
+
+    return {
+        'message_count': message_count,
+        'per_message_seconds': per_message_seconds,
+        'pooled_seconds': pooled_seconds,
+        'send_many_seconds': send_many_seconds,
+    }
+
+
+async def benchmark_async_email_delivery(message_count: int = 200, pool_size: int = 4) -> dict:
+    """Measure AsyncEmailService.send_many against the local SMTP stand-in"""
+    with LocalSMTPServer() as server:
+        service = AsyncEmailService(
+            server.host, server.port, "bench@example.com", "secret",
+            pool_size=pool_size, use_tls=False
+        )
+        messages = [
+            (f"patient{i}@example.com", "Appointment Reminder", "See you tomorrow", False)
+            for i in range(message_count)
+        ]
+
+        start = time.perf_counter()
+        await service.send_many(messages)
+        send_many_seconds = time.perf_counter() - start
+        await service.close()
+
+    return {
+        'message_count': message_count,
+        'send_many_seconds': send_many_seconds,
+    }
+
+
+def _build_reminder_contexts(count: int):
+    """Build customers and appointments for a nightly reminder run"""
+    now = datetime.now()
+    contexts = []
+    for i in range(count):
+        customer = Customer(
+            id=f"cust_{i}",
+            name=f"Patient {i}",
+            email=f"patient{i}@example.com",
+            phone="+27123456789",
+            created_at=now
+        )
+        appointment = Appointment(
+            id=f"apt_{i}",
+            customer_id=customer.id,
+            service_type="Teeth Cleaning",
+            scheduled_time=now + timedelta(days=1, minutes=i % 600),
+            duration_minutes=30,
+            status=AppointmentStatus.SCHEDULED
+        )
+        contexts.append({'customer': customer, 'appointment': appointment})
+    return contexts
+
+
+async def benchmark_reminder_batch(reminder_count: int = 10_000, pool_size: int = 4) -> dict:
+    """Compare per-call reminder workflows with WorkflowEngine.run_batch"""
+    contexts = _build_reminder_contexts(reminder_count)
+
+    with LocalSMTPServer(message_latency=0.002) as server:
+        email_service = EmailService(
+            server.host, server.port, "bench@example.com", "secret",
+            pool_size=pool_size, use_tls=False
+        )
+        engine = WorkflowEngine(email_service=email_service)
+
+        start = time.perf_counter()
+        for context in contexts:
+            await engine.schedule_reminder_workflow(
+                context['customer'], context['appointment'], email_service
+            )
+        per_call_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summary = await engine.run_batch("AppointmentReminder", contexts)
+        batch_seconds = time.perf_counter() - start
+
+        email_service.close()
+
+    return {
+        'reminder_count': reminder_count,
+        'per_call_seconds': per_call_seconds,
+        'batch_seconds': batch_seconds,
+        'batch_successful': summary['tasks_successful'],
+        'email_batches_sent': summary['email_batches_sent'],
+    }
+
+
+def benchmark_registry_indexes(appointment_count: int = 1_000_000, customer_count: int = 100_000) -> dict:
+    """Compare indexed registry queries with full scans"""
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    statuses = list(AppointmentStatus)
+    appointments = [
+        Appointment(
+            id=f"apt_{i}",
+            customer_id=f"cust_{i % customer_count}",
+            service_type="Teeth Cleaning",
+            scheduled_time=day + timedelta(minutes=30 * ((i * 7919) % (365 * 20))),
+            duration_minutes=30,
+            status=statuses[i % len(statuses)]
+        )
+        for i in range(appointment_count)
+    ]
+
+    engine = WorkflowEngine()
+    start = time.perf_counter()
+    engine.add_appointments(appointments)
+    load_seconds = time.perf_counter() - start
+
+    window_start, window_end = day.replace(hour=8), day.replace(hour=12)
+    queries = {
+        'customer': (
+            lambda: engine.get_customer_appointments("cust_42"),
+            lambda: [a for a in engine.appointments.values() if a.customer_id == "cust_42"],
+        ),
+        'time_window': (
+            lambda: engine.get_appointments_between(window_start, window_end),
+            lambda: [a for a in engine.appointments.values()
+                     if window_start <= a.scheduled_time < window_end],
+        ),
+        'status_in_window': (
+            lambda: engine.get_appointments_between(window_start, window_end, AppointmentStatus.CONFIRMED),
+            lambda: [a for a in engine.appointments.values()
+                     if window_start <= a.scheduled_time < window_end
+                     and a.status == AppointmentStatus.CONFIRMED],
+        ),
+    }
+
+    results = {'appointment_count': appointment_count, 'load_seconds': load_seconds, 'queries': {}}
+    for name, (indexed, scan) in queries.items():
+        start = time.perf_counter()
+        indexed_rows = indexed()
+        indexed_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        scan_rows = scan()
+        scan_seconds = time.perf_counter() - start
+        assert len(indexed_rows) == len(scan_rows)
+        results['queries'][name] = (indexed_seconds, scan_seconds, len(indexed_rows))
+
+    return results
+
+
+def _unslotted(cls):
+    """Rebuild a model as a plain dataclass with a per-instance __dict__"""
+    fields = [
+        (f.name, f.type, dataclasses.field(default=f.default))
+        if f.default is not dataclasses.MISSING else (f.name, f.type)
+        for f in dataclasses.fields(cls)
+    ]
+    return dataclasses.make_dataclass(f"Unslotted{cls.__name__}", fields)
+
+
+def _asdict_serializer(date_fields, enum_fields):
+    def to_dict(record):
+        data = dataclasses.asdict(record)
+        for name in date_fields:
+            data[name] = data[name].isoformat() if data[name] else None
+        for name in enum_fields:
+            data[name] = data[name].value
+        return data
+    return to_dict
+
+
+def benchmark_model_footprint(record_count: int = 100_000, serialize_count: int = 200_000) -> dict:
+    """Compare bytes per record and to_dict throughput with the unslotted asdict models"""
+    now = datetime.now()
+    factories = {
+        'Customer': (
+            Customer,
+            lambda cls, i: cls(
+                id=f"cust_{i}", name=f"Patient {i}", email=f"patient{i}@example.com",
+                phone="+15555550100", created_at=now, last_visit=now, loyalty_points=i % 500,
+                preferences={'contact': 'email', 'language': 'en'}
+            ),
+            _asdict_serializer(('created_at', 'last_visit'), ()),
+        ),
+        'Appointment': (
+            Appointment,
+            lambda cls, i: cls(
+                id=f"apt_{i}", customer_id=f"cust_{i}", service_type="Teeth Cleaning",
+                scheduled_time=now, duration_minutes=30, status=AppointmentStatus.CONFIRMED,
+                dentist="Dr. Smith", reminders_sent=['24h']
+            ),
+            _asdict_serializer(('scheduled_time',), ('status',)),
+        ),
+        'SupportTicket': (
+            SupportTicket,
+            lambda cls, i: cls(
+                id=f"ticket_{i}", customer_id=f"cust_{i}", subject="Billing question",
+                description="Question about my last invoice", status=SupportTicketStatus.OPEN,
+                created_at=now, updated_at=now,
+                messages=[{'from': 'customer', 'text': 'Hello', 'timestamp': now.isoformat()}]
+            ),
+            _asdict_serializer(('created_at', 'updated_at'), ('status',)),
+        ),
+    }
+
+    def measure(cls, build, to_dict):
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        records = [build(cls, i) for i in range(record_count)]
+        bytes_per_record = (tracemalloc.get_traced_memory()[0] - baseline) / record_count
+        tracemalloc.stop()
+
+        sample = records[:1000]
+        start = time.perf_counter()
+        for i in range(serialize_count):
+            to_dict(sample[i % len(sample)])
+        ops_per_sec = serialize_count / (time.perf_counter() - start)
+        return bytes_per_record, ops_per_sec
+
+    results = {'record_count': record_count, 'models': {}}
+    for name, (cls, build, legacy_to_dict) in factories.items():
+        before = measure(_unslotted(cls), build, legacy_to_dict)
+        after = measure(cls, build, cls.to_dict)
+        results['models'][name] = (before, after)
+
+    return results
+
+
+async def main():
+    """Run all benchmarks"""
+    logging.disable(logging.INFO)
+
+    result = await benchmark_scheduler_loop()
+    print(f"TaskScheduler with {result['task_count']:,} pending tasks")
+    print(f"  add_task:                {result['add_ops_per_sec']:,.0f} ops/sec")
+    print(f"  pause/resume/remove:     {result['mutate_ops_per_sec']:,.0f} ops/sec")
+    print(f"  full scan loop CPU:      {result['full_scan_cpu_per_second'] * 1000:.2f} ms per second")
+    print(f"  heap index loop CPU:     {result['heap_loop_cpu_per_second'] * 1000:.2f} ms per second")
+
+    result = await benchmark_concurrent_dispatch(task_count=100)
+    print(f"Draining {result['task_count']} due tasks")
+    print(f"  serial:                  {result['serial_seconds']:.2f} s")
+    print(f"  concurrent:              {result['concurrent_seconds']:.2f} s")
+
+    result = benchmark_job_store_reload()
+    print(f"SQLiteJobStore with {result['task_count']:,} jobs")
+    print(f"  add + flush:             {result['write_seconds']:.2f} s")
+    print(f"  reload on startup:       {result['reload_seconds']:.2f} s")
+
+    result = benchmark_email_delivery()
+    print(f"Sending {result['message_count']} emails to a local SMTP stand-in")
+    print(f"  new session per message: {result['per_message_seconds']:.2f} s")
+    print(f"  pooled send_email:       {result['pooled_seconds']:.2f} s")
+    print(f"  pooled send_many:        {result['send_many_seconds']:.2f} s")
+
+    if aiosmtplib is not None:
+        result = await benchmark_async_email_delivery()
+        print(f"  async send_many:         {result['send_many_seconds']:.2f} s")
+
+    result = await benchmark_reminder_batch()
+    print(f"Running {result['reminder_count']:,} reminder workflows")
+    print(f"  per-call workflows:      {result['per_call_seconds']:.2f} s")
+    print(f"  run_batch:               {result['batch_seconds']:.2f} s "
+          f"({result['batch_successful']:,} sent in {result['email_batches_sent']} batches)")
+
+    result = benchmark_registry_indexes()
+    print(f"WorkflowEngine registry with {result['appointment_count']:,} appointments "
+          f"(bulk load {result['load_seconds']:.2f} s)")
+    for name, (indexed_seconds, scan_seconds, rows) in result['queries'].items():
+        print(f"  {name + ':':<24} indexed {indexed_seconds * 1000:.3f} ms, "
+              f"full scan {scan_seconds * 1000:.1f} ms ({rows} rows)")
+
+    result = benchmark_model_footprint()
+    print(f"Model footprint over {result['record_count']:,} records (unslotted asdict -> slotted)")
+    for name, ((old_bytes, old_ops), (new_bytes, new_ops)) in result['models'].items():
+        print(f"  {name + ':':<24} {old_bytes:.0f} -> {new_bytes:.0f} bytes/record, "
+              f"to_dict {old_ops:,.0f} -> {new_ops:,.0f} ops/sec")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+Persistent Job Stores for the Task Scheduler
+Keeps scheduled tasks across restarts so reminders and follow-ups are not lost
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .scheduler import ScheduledTask, ScheduleType
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore(ABC):
+    """Base class for scheduler job stores
+
+    Only tasks with a ``job_ref`` are persisted: the callback itself is
+    rebuilt from the reference and the task's ``args``/``kwargs`` on reload.
+    """
+
+    @abstractmethod
+    def load_tasks(self) -> List[ScheduledTask]:
+        """Load stored tasks, at least every active one (callbacks are left unresolved)"""
+        pass
+
+    @abstractmethod
+    def save_task(self, task: ScheduledTask) -> None:
+        """Insert or update a task"""
+        pass
+
+    @abstractmethod
+    def delete_task(self, task_id: str) -> None:
+        """Delete a task"""
+        pass
+
+    @property
+    def pending_writes(self) -> int:
+        """Number of buffered writes not yet flushed"""
+        return 0
+
+    def flush(self) -> None:
+        """Write buffered changes to storage"""
+        pass
+
+    def close(self) -> None:
+        """Flush and release resources"""
+        self.flush()
+
+
+class SQLiteJobStore(JobStore):
+    """SQLite job store for local and single-node deployments
+
+    Writes are buffered and committed in batches of ``batch_size`` (the
+    scheduler also flushes at least every ``flush_interval`` seconds).
+    The database runs in WAL mode so a crash loses at most the unflushed
+    batch and never leaves a partially written one behind.
+    """
+
+    COLUMNS = (
+        'id', 'name', 'job_ref', 'args', 'kwargs', 'schedule_type', 'execute_at',
+        'interval_seconds', 'is_active', 'last_executed', 'retry_count',
+        'max_retries', 'timeout_seconds'
+    )
+
+    def __init__(self, path: str = "scheduler_jobs.db", batch_size: int = 500,
+                 flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Optional[Tuple]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                job_ref TEXT NOT NULL,
+                args TEXT NOT NULL,
+                kwargs TEXT NOT NULL,
+                schedule_type TEXT NOT NULL,
+                execute_at TEXT NOT NULL,
+                interval_seconds INTEGER,
+                is_active INTEGER NOT NULL,
+                last_executed TEXT,
+                retry_count INTEGER NOT NULL,
+                max_retries INTEGER NOT NULL,
+                timeout_seconds REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _to_row(task: ScheduledTask) -> Tuple:
+        return (
+            task.id,
+            task.name,
+            task.job_ref,
+            json.dumps(list(task.args)),
+            json.dumps(task.kwargs),
+            task.schedule_type.value,
+            task.execute_at.isoformat(),
+            task.interval_seconds,
+            int(task.is_active),
+            task.last_executed.isoformat() if task.last_executed else None,
+            task.retry_count,
+            task.max_retries,
+            task.timeout_seconds,
+        )
+
+    @staticmethod
+    def _from_row(row: Tuple) -> ScheduledTask:
+        (task_id, name, job_ref, args, kwargs, schedule_type, execute_at, interval_seconds,
+         is_active, last_executed, retry_count, max_retries, timeout_seconds) = row
+        return ScheduledTask(
+            id=task_id,
+            name=name,
+            callback=None,
+            schedule_type=ScheduleType(schedule_type),
+            execute_at=datetime.fromisoformat(execute_at),
+            interval_seconds=interval_seconds,
+            is_active=bool(is_active),
+            last_executed=datetime.fromisoformat(last_executed) if last_executed else None,
+            retry_count=retry_count,
+            max_retries=max_retries,
+            timeout_seconds=timeout_seconds,
+            job_ref=job_ref,
+            args=json.loads(args),
+            kwargs=json.loads(kwargs),
+        )
+
+    def load_tasks(self) -> List[ScheduledTask]:
+        """Load every active stored task (callbacks are left unresolved)"""
+        self.flush()
+        cursor = self._conn.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM scheduled_jobs WHERE is_active = 1"
+        )
+        tasks = [self._from_row(row) for row in cursor]
+        logger.info(f"Loaded {len(tasks)} jobs from {self.path}")
+        return tasks
+
+    def save_task(self, task: ScheduledTask) -> None:
+        """Insert or update a task"""
+        row = self._to_row(task)
+        with self._lock:
+            self._pending[task.id] = row
+        self._maybe_flush()
+
+    def delete_task(self, task_id: str) -> None:
+        """Delete a task"""
+        with self._lock:
+            self._pending[task_id] = None
+        self._maybe_flush()
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending) >= self.batch_size or \
+           time.monotonic() - self._last_flush >= self.flush_interval:
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Already logged; the batch is retried on the next flush
+                pass
+
+    def flush(self) -> None:
+        """Write buffered changes to storage in a single transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        upserts = [row for row in pending.values() if row is not None]
+        deletes = [(task_id,) for task_id, row in pending.items() if row is None]
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+
+        try:
+            with self._conn:
+                if upserts:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO scheduled_jobs ({', '.join(self.COLUMNS)}) "
+                        f"VALUES ({placeholders})",
+                        upserts
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM scheduled_jobs WHERE id = ?", deletes)
+        except sqlite3.Error as e:
+            logger.error(f"Job store flush failed: {str(e)}")
+            with self._lock:
+                # Keep newer writes that arrived while flushing
+                pending.update(self._pending)
+                self._pending = pending
+            raise
+
+    def close(self) -> None:
+        """Flush and close the database"""
+        self.flush()
+        self._conn.close()
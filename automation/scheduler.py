@@ -4,14 +4,21 @@ Handles scheduled tasks like appointment reminders, follow-ups, etc.
 """
 
 import asyncio
+import functools
+import heapq
+import importlib
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Callable, Any, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 from abc import ABC, abstractmethod
 import json
 
+from .workflow_engine import Appointment, Customer, call_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,25 +45,142 @@ class ScheduledTask:
     next_execution: datetime = None
     retry_count: int = 0
     max_retries: int = 3
+    timeout_seconds: Optional[float] = None
+    job_ref: Optional[str] = None
+    args: List[Any] = field(default_factory=list)
+    kwargs: Dict[str, Any] = field(default_factory=dict)
 
 
 class TaskScheduler:
-    """Background task scheduler"""
-
-    def __init__(self):
+    """Background task scheduler
+
+    Active tasks are indexed in a min-heap keyed on ``execute_at`` so the
+    execution loop sleeps until the next due task instead of polling.
+    Removed, paused and rescheduled tasks leave stale heap entries behind
+    which are discarded lazily when they reach the top of the heap.
+
+    Due tasks are dispatched concurrently, bounded by ``max_concurrent_tasks``.
+    Coroutine callbacks run on the event loop; plain callables (such as
+    ``EmailService.send_email``) run on a thread pool so they cannot block it.
+    ``task_timeout`` is the default per-task timeout, overridable per task via
+    ``ScheduledTask.timeout_seconds``. Use ``max_concurrent_tasks=1`` for
+    strictly serial execution.
+
+    With a ``job_store`` (see ``automation.job_store``) every task that has a
+    ``job_ref`` is persisted and reloaded on ``start()``. A ``job_ref`` is
+    either a name passed to ``register_job`` or a ``"module:function"`` path;
+    the callback is rebuilt from it with the task's ``args`` and ``kwargs``.
+    One-shot tasks are deleted from the store once they have run, and only
+    active tasks are reloaded, so paused or disabled tasks don't survive a
+    restart.
+    """
+
+    def __init__(self, max_concurrent_tasks: int = 10, task_timeout: Optional[float] = None,
+                 thread_pool_size: Optional[int] = None, job_store=None):
         self.tasks: Dict[str, ScheduledTask] = {}
         self.running = False
         self.executor_task = None
+        self.max_concurrent_tasks = max(1, max_concurrent_tasks)
+        self.task_timeout = task_timeout
+        self.thread_pool_size = thread_pool_size or self.max_concurrent_tasks
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._in_flight: set = set()
+        self._running_ids: set = set()
+        self.job_store = job_store
+        self._jobs: Dict[str, Callable] = {}
+        self._job_trackers: Dict[str, Dict[str, ScheduledTask]] = {}
+        self._heap: List[list] = []
+        self._heap_entries: Dict[str, list] = {}
+        self._stale_entries = 0
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register_job(self, job_ref: str, func: Callable,
+                     tracker: Optional[Dict[str, ScheduledTask]] = None) -> None:
+        """Register a callable that persisted tasks can refer to by name
+
+        Tasks reloaded from the job store with this ``job_ref`` are also
+        added to ``tracker`` so their owner can manage them again.
+        """
+        self._jobs[job_ref] = func
+        if tracker is not None:
+            self._job_trackers[job_ref] = tracker
+            for task in self.tasks.values():
+                if task.job_ref == job_ref:
+                    tracker.setdefault(task.id, task)
+
+    def load_jobs(self) -> int:
+        """Load active persisted tasks from the job store; returns the number loaded"""
+        if self.job_store is None:
+            return 0
+
+        loaded = 0
+        for task in self.job_store.load_tasks():
+            if not task.is_active or task.id in self.tasks:
+                continue
+            self.tasks[task.id] = task
+            tracker = self._job_trackers.get(task.job_ref)
+            if tracker is not None:
+                tracker[task.id] = task
+            entry = [task.execute_at, next(self._sequence), task.id]
+            self._heap_entries[task.id] = entry
+            self._heap.append(entry)
+            loaded += 1
+
+        heapq.heapify(self._heap)
+        self._wake()
+        logger.info(f"Loaded {loaded} persisted tasks")
+        return loaded
+
+    def _persist(self, task: ScheduledTask) -> None:
+        """Write a task to the job store if it can be persisted"""
+        if self.job_store is not None and task.job_ref:
+            idle = not self.job_store.pending_writes
+            self.job_store.save_task(task)
+            if idle:
+                # Let the loop schedule a flush
+                self._wake()
+
+    def _unpersist(self, task: ScheduledTask) -> None:
+        """Delete a task from the job store if it was persisted"""
+        if self.job_store is not None and task.job_ref:
+            idle = not self.job_store.pending_writes
+            self.job_store.delete_task(task.id)
+            if idle:
+                self._wake()
+
+    def _resolve_callback(self, task: ScheduledTask) -> Callable:
+        """Build a task callback from its job reference"""
+        func = self._jobs.get(task.job_ref)
+        if func is None and task.job_ref and ':' in task.job_ref:
+            module_name, _, attr_path = task.job_ref.partition(':')
+            func = importlib.import_module(module_name)
+            for attr in attr_path.split('.'):
+                func = getattr(func, attr)
+        if func is None:
+            raise LookupError(f"Unknown job reference: {task.job_ref}")
+        task.callback = functools.partial(func, *task.args, **task.kwargs)
+        return task.callback
 
     def add_task(self, task: ScheduledTask) -> None:
         """Add a task to the scheduler"""
         self.tasks[task.id] = task
+        if task.is_active:
+            self._push(task)
+        else:
+            self._discard(task.id)
+        self._persist(task)
         logger.info(f"Task added: {task.name} (ID: {task.id})")
 
     def remove_task(self, task_id: str) -> bool:
         """Remove a task from the scheduler"""
         if task_id in self.tasks:
             del self.tasks[task_id]
+            self._discard(task_id)
+            if self.job_store is not None:
+                self.job_store.delete_task(task_id)
+                self._wake()
             logger.info(f"Task removed: {task_id}")
             return True
         return False
@@ -65,6 +189,8 @@ class TaskScheduler:
         """Pause a task"""
         if task_id in self.tasks:
             self.tasks[task_id].is_active = False
+            self._discard(task_id)
+            self._persist(self.tasks[task_id])
             logger.info(f"Task paused: {task_id}")
             return True
         return False
@@ -72,54 +198,203 @@ class TaskScheduler:
     def resume_task(self, task_id: str) -> bool:
         """Resume a paused task"""
         if task_id in self.tasks:
-            self.tasks[task_id].is_active = True
+            task = self.tasks[task_id]
+            task.is_active = True
+            self._push(task)
+            self._persist(task)
             logger.info(f"Task resumed: {task_id}")
             return True
         return False
 
+    def reschedule_task(self, task_id: str, execute_at: datetime) -> bool:
+        """Move a task to a new execution time"""
+        if task_id in self.tasks:
+            task = self.tasks[task_id]
+            task.execute_at = execute_at
+            if task.is_active:
+                self._push(task)
+            self._persist(task)
+            logger.info(f"Task rescheduled: {task_id} to {execute_at}")
+            return True
+        return False
+
+    def next_due(self) -> Optional[datetime]:
+        """Get the execution time of the next active task"""
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def _push(self, task: ScheduledTask) -> None:
+        """Index a task by its execution time, replacing any previous entry"""
+        self._discard(task.id)
+        if task.id in self._running_ids:
+            # Re-indexed once the running execution finishes
+            return
+        entry = [task.execute_at, next(self._sequence), task.id]
+        self._heap_entries[task.id] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wake()
+
+    def _discard(self, task_id: str) -> None:
+        """Invalidate the heap entry of a task (removed lazily)"""
+        entry = self._heap_entries.pop(task_id, None)
+        if entry is not None:
+            entry[2] = None
+            self._stale_entries += 1
+            if self._stale_entries > 1024 and self._stale_entries * 2 > len(self._heap):
+                self._compact()
+            self._wake()
+
+    def _compact(self) -> None:
+        """Rebuild the heap without invalidated entries"""
+        self._heap = [entry for entry in self._heap if entry[2] is not None]
+        heapq.heapify(self._heap)
+        self._stale_entries = 0
+
+    def _prune(self) -> None:
+        """Drop invalidated entries from the top of the heap"""
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+            self._stale_entries -= 1
+
+    def _pop_due(self, now: datetime) -> List[ScheduledTask]:
+        """Pop every active task whose execution time has passed"""
+        due = []
+        while self._heap:
+            execute_at, _, task_id = self._heap[0]
+            if task_id is not None and execute_at > now:
+                break
+            heapq.heappop(self._heap)
+            if task_id is None:
+                self._stale_entries -= 1
+                continue
+            del self._heap_entries[task_id]
+            task = self.tasks[task_id]
+            if task.is_active:
+                due.append(task)
+        return due
+
+    def _wake(self) -> None:
+        """Interrupt the execution loop's sleep"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
     async def start(self) -> None:
         """Start the scheduler"""
         self.running = True
+        self._wakeup = asyncio.Event()
+        self.load_jobs()
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=self.thread_pool_size,
+            thread_name_prefix="scheduler"
+        )
         logger.info("Task scheduler started")
         self.executor_task = asyncio.create_task(self._execute_loop())
 
     async def stop(self) -> None:
         """Stop the scheduler"""
         self.running = False
+        self._wake()
         if self.executor_task:
             await self.executor_task
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+        if self.job_store is not None:
+            self.job_store.flush()
         logger.info("Task scheduler stopped")
 
     async def _execute_loop(self) -> None:
         """Main execution loop"""
         while self.running:
             try:
+                self._wakeup.clear()
+                if self.job_store is not None and self.job_store.pending_writes:
+                    self.job_store.flush()
                 now = datetime.now()
-                
-                for task_id, task in list(self.tasks.items()):
-                    if not task.is_active:
-                        continue
 
-                    if now >= task.execute_at:
-                        await self._execute_task(task)
-                        self._update_next_execution(task)
-
-                # Check every second
-                await asyncio.sleep(1)
+                for task in self._pop_due(now):
+                    await self._semaphore.acquire()
+                    if not task.is_active or self.tasks.get(task.id) is not task:
+                        # Paused or removed while waiting for a free slot
+                        self._semaphore.release()
+                        continue
+                    if task.id in self._heap_entries or task.execute_at > datetime.now():
+                        # Rescheduled or resumed while waiting; runs from its new heap entry
+                        self._semaphore.release()
+                        if task.id not in self._heap_entries:
+                            self._push(task)
+                        continue
+                    self._running_ids.add(task.id)
+                    job = asyncio.create_task(self._run_task(task))
+                    self._in_flight.add(job)
+                    job.add_done_callback(self._in_flight.discard)
+
+                # Sleep until the next task is due or the index changes
+                next_due = self.next_due()
+                timeout = None
+                if next_due is not None:
+                    timeout = max((next_due - datetime.now()).total_seconds(), 0)
+                if self.job_store is not None and self.job_store.pending_writes:
+                    # Writes buffered by the job store are flushed on the next wake-up
+                    flush_interval = getattr(self.job_store, 'flush_interval', 1.0)
+                    timeout = flush_interval if timeout is None else min(timeout, flush_interval)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
 
             except Exception as e:
                 logger.error(f"Scheduler loop error: {str(e)}")
                 await asyncio.sleep(1)
 
+    async def _run_task(self, task: ScheduledTask) -> None:
+        """Execute a due task and re-index it for its next run"""
+        try:
+            await self._execute_task(task)
+            self._update_next_execution(task)
+        except Exception as e:
+            logger.error(f"Scheduler dispatch error: {task.name} - {str(e)}")
+        finally:
+            self._running_ids.discard(task.id)
+            self._semaphore.release()
+
+        if self.tasks.get(task.id) is task:
+            if task.is_active:
+                self._push(task)
+                self._persist(task)
+            elif task.schedule_type == ScheduleType.ONCE:
+                # A finished one-shot task has nothing left to reload
+                self._unpersist(task)
+            else:
+                self._persist(task)
+
+    async def _invoke(self, task: ScheduledTask) -> None:
+        """Invoke a task callback, off the event loop if it is synchronous"""
+        timeout = task.timeout_seconds if task.timeout_seconds is not None else self.task_timeout
+
+        callback = task.callback or self._resolve_callback(task)
+
+        if asyncio.iscoroutinefunction(callback):
+            call = callback()
+        else:
+            loop = asyncio.get_running_loop()
+            call = loop.run_in_executor(self._thread_pool, callback)
+
+        try:
+            await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"timed out after {timeout}s")
+
     async def _execute_task(self, task: ScheduledTask) -> None:
         """Execute a single task"""
         try:
             logger.info(f"Executing task: {task.name}")
             
-            if asyncio.iscoroutinefunction(task.callback):
-                await task.callback()
-            else:
-                task.callback()
+            await self._invoke(task)
             
             task.last_executed = datetime.now()
             task.retry_count = 0
@@ -169,13 +444,57 @@ class TaskScheduler:
         return [self.get_task_status(task_id) for task_id in self.tasks]
 
 
+def _appointment_records(workflow_engine, appointment_id: str, customer_id: str,
+                         snapshot: Optional[Dict[str, dict]] = None) -> Tuple[Customer, Appointment]:
+    """Get the engine's current customer and appointment, else the task's snapshot
+
+    The engine's registries are in memory, so after a restart persisted
+    reminders and follow-ups fall back to the records captured when they
+    were scheduled.
+    """
+    appointment = workflow_engine.appointments.get(appointment_id)
+    customer = workflow_engine.customers.get(customer_id)
+
+    if snapshot:
+        appointment = appointment or Appointment.from_dict(snapshot['appointment'])
+        customer = customer or Customer.from_dict(snapshot['customer'])
+
+    if not appointment or not customer:
+        raise LookupError(f"Appointment {appointment_id} or customer {customer_id} not found")
+    return customer, appointment
+
+
+def _snapshot(customer: Customer, appointment: Appointment) -> Dict[str, dict]:
+    """Records a persisted task needs to run without the engine's registries"""
+    return {'customer': customer.to_dict(), 'appointment': appointment.to_dict()}
+
+
 class ReminderScheduler:
     """Manages appointment reminders"""
 
+    JOB_REF = "appointment_reminder"
+
     def __init__(self, scheduler: TaskScheduler, workflow_engine):
         self.scheduler = scheduler
         self.workflow_engine = workflow_engine
         self.reminders: Dict[str, ScheduledTask] = {}
+        scheduler.register_job(self.JOB_REF, self._send_reminder, self.reminders)
+
+    async def _send_reminder(self, appointment_id: str, customer_id: str,
+                             reminder_minutes_before: int,
+                             snapshot: Optional[Dict[str, dict]] = None) -> None:
+        """Run the reminder workflow for an appointment"""
+        customer, appointment = _appointment_records(
+            self.workflow_engine, appointment_id, customer_id, snapshot
+        )
+
+        await self.workflow_engine.schedule_reminder_workflow(
+            customer,
+            appointment,
+            self.workflow_engine.email_service,
+            self.workflow_engine.sms_service,
+            hours_before=reminder_minutes_before // 60
+        )
 
     async def schedule_reminder(self, appointment_id: str, customer_id: str, 
                                reminder_minutes_before: int = 1440) -> str:
@@ -191,21 +510,17 @@ class ReminderScheduler:
         reminder_time = appointment.scheduled_time - timedelta(minutes=reminder_minutes_before)
         reminder_id = f"reminder_{appointment_id}_{reminder_minutes_before}"
 
-        async def send_reminder():
-            await self.workflow_engine.schedule_reminder_workflow(
-                customer,
-                appointment,
-                self.workflow_engine.email_service,
-                self.workflow_engine.sms_service,
-                hours_before=reminder_minutes_before // 60
-            )
-
+        args = [appointment_id, customer_id, reminder_minutes_before]
+        kwargs = {'snapshot': _snapshot(customer, appointment)}
         task = ScheduledTask(
             id=reminder_id,
             name=f"Reminder for {customer.name} - {appointment.service_type}",
-            callback=send_reminder,
+            callback=functools.partial(self._send_reminder, *args, **kwargs),
             schedule_type=ScheduleType.ONCE,
-            execute_at=reminder_time
+            execute_at=reminder_time,
+            job_ref=self.JOB_REF,
+            args=args,
+            kwargs=kwargs
         )
 
         self.scheduler.add_task(task)
@@ -231,10 +546,42 @@ class ReminderScheduler:
 class FollowUpScheduler:
     """Manages post-appointment follow-ups"""
 
+    JOB_REF = "appointment_follow_up"
+
     def __init__(self, scheduler: TaskScheduler, workflow_engine):
         self.scheduler = scheduler
         self.workflow_engine = workflow_engine
         self.follow_ups: Dict[str, ScheduledTask] = {}
+        scheduler.register_job(self.JOB_REF, self._send_follow_up, self.follow_ups)
+
+    async def _send_follow_up(self, appointment_id: str, customer_id: str,
+                              snapshot: Optional[Dict[str, dict]] = None) -> None:
+        """Send the follow-up email for an appointment"""
+        customer, appointment = _appointment_records(
+            self.workflow_engine, appointment_id, customer_id, snapshot
+        )
+
+        # Create and send follow-up message
+        subject = f"How was your {appointment.service_type} appointment?"
+        html_body = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif;">
+                <h2>Follow-up</h2>
+                <p>Dear {customer.name},</p>
+                <p>We hope your {appointment.service_type} appointment went well!</p>
+                <p>If you have any questions or concerns, please don't hesitate to contact us.</p>
+                <p>We'd love to hear your feedback. Please reply to this email or call us.</p>
+                <p>Best regards,<br>Makhanda Smiles Dental Practice</p>
+            </body>
+        </html>
+        """
+        await call_service(
+            self.workflow_engine.email_service.send_email,
+            customer.email,
+            subject,
+            html_body,
+            html=True
+        )
 
     async def schedule_follow_up(self, appointment_id: str, customer_id: str, 
                                 days_after: int = 3) -> str:
@@ -250,34 +597,17 @@ class FollowUpScheduler:
         follow_up_time = appointment.scheduled_time + timedelta(days=days_after)
         follow_up_id = f"followup_{appointment_id}_{days_after}d"
 
-        async def send_follow_up():
-            # Create and send follow-up message
-            subject = f"How was your {appointment.service_type} appointment?"
-            html_body = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif;">
-                    <h2>Follow-up</h2>
-                    <p>Dear {customer.name},</p>
-                    <p>We hope your {appointment.service_type} appointment went well!</p>
-                    <p>If you have any questions or concerns, please don't hesitate to contact us.</p>
-                    <p>We'd love to hear your feedback. Please reply to this email or call us.</p>
-                    <p>Best regards,<br>Makhanda Smiles Dental Practice</p>
-                </body>
-            </html>
-            """
-            self.workflow_engine.email_service.send_email(
-                customer.email,
-                subject,
-                html_body,
-                html=True
-            )
-
+        args = [appointment_id, customer_id]
+        kwargs = {'snapshot': _snapshot(customer, appointment)}
         task = ScheduledTask(
             id=follow_up_id,
             name=f"Follow-up for {customer.name}",
-            callback=send_follow_up,
+            callback=functools.partial(self._send_follow_up, *args, **kwargs),
             schedule_type=ScheduleType.ONCE,
-            execute_at=follow_up_time
+            execute_at=follow_up_time,
+            job_ref=self.JOB_REF,
+            args=args,
+            kwargs=kwargs
         )
 
         self.scheduler.add_task(task)
@@ -0,0 +1,126 @@
+"""
+Workflow engine regression tests
+Run from the repository root with: python -m pytest automation/test_workflow_engine.py
+"""
+
+import asyncio
+import smtplib
+import time
+from datetime import datetime, timedelta
+
+from automation.workflow_engine import (
+    Appointment, AppointmentStatus, Customer, EmailService, WorkflowEngine
+)
+
+BASE = datetime(2026, 3, 2, 9, 0)
+
+
+def appointment(appointment_id: str, hours: int) -> Appointment:
+    return Appointment(
+        id=appointment_id,
+        customer_id='cust_1',
+        service_type='General Checkup',
+        scheduled_time=BASE + timedelta(hours=hours),
+        duration_minutes=30,
+        status=AppointmentStatus.SCHEDULED
+    )
+
+
+def test_add_many_replaces_moved_appointments():
+    engine = WorkflowEngine()
+    engine.add_appointments([appointment(i, h) for i, h in (('a', 0), ('b', 1), ('c', 2), ('x', 3))])
+
+    # A new early appointment ahead of moved ones leaves the time index unsorted mid-batch
+    engine.add_appointments([
+        appointment('w', -1), appointment('c', 6), appointment('z', 5), appointment('a', 7)
+    ])
+
+    window = [a.id for a in engine.get_appointments_between(BASE - timedelta(hours=2), BASE + timedelta(days=1))]
+    assert window == ['w', 'b', 'x', 'z', 'c', 'a']
+
+    assert engine.remove_appointment('c')
+    assert engine.remove_appointment('a')
+    window = [a.id for a in engine.get_appointments_between(BASE - timedelta(hours=2), BASE + timedelta(days=1))]
+    assert window == ['w', 'b', 'x', 'z']
+
+
+def test_add_many_keeps_last_record_of_a_repeated_id():
+    engine = WorkflowEngine()
+    engine.add_appointments([appointment('a', 0), appointment('b', 1), appointment('a', 2)])
+
+    window = [a.id for a in engine.get_appointments_between(BASE, BASE + timedelta(days=1))]
+    assert window == ['b', 'a']
+    assert engine.appointments['a'].scheduled_time == BASE + timedelta(hours=2)
+    assert engine.remove_appointment('a')
+
+
+class RecordingSMSService:
+    def __init__(self):
+        self.sent = []
+
+    async def send_many(self, messages):
+        self.sent.extend(messages)
+        return [True] * len(messages)
+
+    async def send_appointment_reminder_sms(self, phone_number, appointment):
+        return True
+
+
+def test_run_batch_without_email_service():
+    sms = RecordingSMSService()
+    engine = WorkflowEngine(sms_service=sms)
+    customer = Customer(id='cust_1', name='Ann Lee', email='ann@example.com',
+                        phone='+27820000000', created_at=BASE)
+    contexts = [{'customer': customer, 'appointment': appointment(f'a{i}', i)} for i in range(3)]
+
+    summary = asyncio.run(engine.run_batch('AppointmentReminder', contexts))
+
+    assert summary['total_workflows'] == 3
+    assert summary['email_batches_sent'] == 0
+    assert summary['task_stats']['SendAppointmentReminder'] == {'successful': 0, 'failed': 3}
+
+
+class FakeSMTP:
+    def __init__(self, *args, stale=False, **kwargs):
+        self.stale = stale
+        self.closed = False
+        self.sent = []
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        return (250, b'OK')
+
+    def send_message(self, msg):
+        if self.stale:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        self.sent.append(msg)
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def test_send_email_reconnects_past_stale_pooled_sessions(monkeypatch):
+    opened = []
+
+    def connect(*args, **kwargs):
+        server = FakeSMTP()
+        opened.append(server)
+        return server
+
+    monkeypatch.setattr(smtplib, 'SMTP', connect)
+    service = EmailService('smtp.example.com', 587, 'clinic@example.com', 'secret')
+    stale = [FakeSMTP(stale=True), FakeSMTP(stale=True)]
+    for server in stale:
+        service.pool._idle.put((server, time.monotonic()))
+
+    assert service.send_email('ann@example.com', 'Hi', 'Body')
+    assert len(opened) == 1 and len(opened[0].sent) == 1
+    assert all(server.closed for server in stale)
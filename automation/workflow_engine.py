@@ -4,19 +4,37 @@ Automates customer support, appointment management, and related processes
 """
 
 import asyncio
+import bisect
 import json
+import queue
 import smtplib
 import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Any, Callable, Tuple
+from dataclasses import dataclass
 from enum import Enum
 from abc import ABC, abstractmethod
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import re
+import sys
 import requests
 
+try:
+    import aiosmtplib
+except ImportError:  # Optional: only needed for AsyncEmailService
+    aiosmtplib = None
+
+try:
+    import httpx
+except ImportError:  # Optional: only needed for AsyncSMSService
+    httpx = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +42,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Slotted models drop the per-instance __dict__ (Python 3.10+)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 
 class WorkflowStatus(Enum):
     """Workflow execution status"""
@@ -53,7 +74,7 @@ class SupportTicketStatus(Enum):
     PENDING = "pending"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Customer:
     """Customer information"""
     id: str
@@ -66,13 +87,32 @@ class Customer:
     preferences: Dict[str, Any] = None
 
     def to_dict(self) -> dict:
-        data = asdict(self)
-        data['created_at'] = self.created_at.isoformat()
-        data['last_visit'] = self.last_visit.isoformat() if self.last_visit else None
-        return data
-
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'phone': self.phone,
+            'created_at': self.created_at.isoformat(),
+            'last_visit': self.last_visit.isoformat() if self.last_visit else None,
+            'loyalty_points': self.loyalty_points,
+            'preferences': dict(self.preferences) if self.preferences is not None else None
+        }
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Customer':
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            email=data['email'],
+            phone=data['phone'],
+            created_at=datetime.fromisoformat(data['created_at']),
+            last_visit=datetime.fromisoformat(data['last_visit']) if data.get('last_visit') else None,
+            loyalty_points=data.get('loyalty_points', 0),
+            preferences=data.get('preferences')
+        )
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class Appointment:
     """Appointment information"""
     id: str
@@ -86,13 +126,34 @@ class Appointment:
     reminders_sent: List[str] = None
 
     def to_dict(self) -> dict:
-        data = asdict(self)
-        data['scheduled_time'] = self.scheduled_time.isoformat()
-        data['status'] = self.status.value
-        return data
-
+        return {
+            'id': self.id,
+            'customer_id': self.customer_id,
+            'service_type': self.service_type,
+            'scheduled_time': self.scheduled_time.isoformat(),
+            'duration_minutes': self.duration_minutes,
+            'status': self.status.value,
+            'dentist': self.dentist,
+            'notes': self.notes,
+            'reminders_sent': list(self.reminders_sent) if self.reminders_sent is not None else None
+        }
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Appointment':
+        return cls(
+            id=data['id'],
+            customer_id=data['customer_id'],
+            service_type=data['service_type'],
+            scheduled_time=datetime.fromisoformat(data['scheduled_time']),
+            duration_minutes=data['duration_minutes'],
+            status=AppointmentStatus(data['status']),
+            dentist=data.get('dentist'),
+            notes=data.get('notes'),
+            reminders_sent=data.get('reminders_sent')
+        )
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class SupportTicket:
     """Support ticket information"""
     id: str
@@ -107,39 +168,252 @@ class SupportTicket:
     messages: List[Dict[str, str]] = None
 
     def to_dict(self) -> dict:
-        data = asdict(self)
-        data['created_at'] = self.created_at.isoformat()
-        data['updated_at'] = self.updated_at.isoformat()
-        data['status'] = self.status.value
-        return data
+        return {
+            'id': self.id,
+            'customer_id': self.customer_id,
+            'subject': self.subject,
+            'description': self.description,
+            'status': self.status.value,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'assigned_to': self.assigned_to,
+            'priority': self.priority,
+            'messages': [dict(m) for m in self.messages] if self.messages is not None else None
+        }
+
+
+def appointment_confirmation_email(customer: Customer, appointment: Appointment) -> Tuple[str, str]:
+    """Build the subject and HTML body of an appointment confirmation"""
+    subject = f"Appointment Confirmation - {appointment.service_type}"
+    html_body = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2>Appointment Confirmation</h2>
+            <p>Dear {customer.name},</p>
+            <p>Your appointment has been confirmed:</p>
+            <ul>
+                <li><strong>Service:</strong> {appointment.service_type}</li>
+                <li><strong>Date & Time:</strong> {appointment.scheduled_time.strftime('%Y-%m-%d %H:%M')}</li>
+                <li><strong>Duration:</strong> {appointment.duration_minutes} minutes</li>
+                {f'<li><strong>Dentist:</strong> {appointment.dentist}</li>' if appointment.dentist else ''}
+            </ul>
+            <p>If you need to reschedule, please contact us at least 24 hours before your appointment.</p>
+            <p>Best regards,<br>Makhanda Smiles Dental Practice</p>
+        </body>
+    </html>
+    """
+    return subject, html_body
+
+
+def appointment_reminder_email(customer: Customer, appointment: Appointment, hours_before: int) -> Tuple[str, str]:
+    """Build the subject and HTML body of an appointment reminder"""
+    subject = f"Reminder: Your appointment is in {hours_before} hours"
+    html_body = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2>Appointment Reminder</h2>
+            <p>Dear {customer.name},</p>
+            <p>This is a friendly reminder about your upcoming appointment:</p>
+            <ul>
+                <li><strong>Service:</strong> {appointment.service_type}</li>
+                <li><strong>Date & Time:</strong> {appointment.scheduled_time.strftime('%Y-%m-%d %H:%M')}</li>
+                <li><strong>Duration:</strong> {appointment.duration_minutes} minutes</li>
+            </ul>
+            <p>Please arrive 10 minutes early. If you need to cancel or reschedule, contact us immediately.</p>
+            <p>Best regards,<br>Makhanda Smiles Dental Practice</p>
+        </body>
+    </html>
+    """
+    return subject, html_body
+
+
+def support_ticket_response_email(customer: Customer, ticket: SupportTicket, response: str) -> Tuple[str, str]:
+    """Build the subject and HTML body of a support ticket response"""
+    subject = f"Re: {ticket.subject} - Support Ticket #{ticket.id}"
+    html_body = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2>Support Ticket Response</h2>
+            <p>Dear {customer.name},</p>
+            <p>Thank you for contacting us. Here's our response:</p>
+            <div style="background-color: #f5f5f5; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
+                {response}
+            </div>
+            <p>If you have any further questions, please reply to this email.</p>
+            <p>Best regards,<br>Support Team - Makhanda Smiles</p>
+        </body>
+    </html>
+    """
+    return subject, html_body
+
+
+def appointment_reminder_sms(appointment: Appointment) -> str:
+    """Build the text of an appointment reminder SMS"""
+    return f"Reminder: Your {appointment.service_type} appointment is on {appointment.scheduled_time.strftime('%m/%d at %H:%M')}. Reply CONFIRM to confirm or CANCEL to cancel."
+
+
+async def call_service(func: Callable, *args, **kwargs) -> Any:
+    """Call a communication service method without blocking the event loop
+
+    Async services are awaited directly; blocking ones (``EmailService``,
+    ``SMSService``) run in a worker thread.
+    """
+    if asyncio.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+class SMTPConnectionPool:
+    """Pool of authenticated SMTP sessions shared across threads
+
+    Sessions are opened lazily (connect, STARTTLS, login) up to ``max_size``
+    and returned to the pool after each message. Sessions idle for longer
+    than ``max_idle_seconds`` are checked with NOOP before reuse.
+    """
+
+    def __init__(self, smtp_server: str, smtp_port: int, sender_email: str, sender_password: str,
+                 max_size: int = 4, use_tls: bool = True, timeout: float = 30,
+                 max_idle_seconds: float = 60):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.max_size = max(1, max_size)
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP session"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.sender_password:
+                server.login(self.sender_email, self.sender_password)
+        except Exception:
+            self._close(server)
+            raise
+        self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def acquire(self, fresh: bool = False) -> smtplib.SMTP:
+        """Take a session from the pool, opening one if none is idle or ``fresh`` is set"""
+        self._slots.acquire()
+        try:
+            if fresh:
+                return self._connect()
+            while True:
+                try:
+                    server, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+
+                if time.monotonic() - last_used < self.max_idle_seconds:
+                    return server
+                try:
+                    if server.noop()[0] == 250:
+                        return server
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._close(server)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, server: smtplib.SMTP, discard: bool = False) -> None:
+        """Return a session to the pool, or close it if it is broken"""
+        try:
+            if discard:
+                self._close(server)
+            else:
+                self._idle.put((server, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, fresh: bool = False):
+        """Borrow a session for the duration of a ``with`` block"""
+        server = self.acquire(fresh)
+        try:
+            yield server
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self.release(server, discard=True)
+            raise
+        except Exception:
+            self.release(server)
+            raise
+        else:
+            self.release(server)
+
+    def close(self) -> None:
+        """Close all idle sessions"""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(server)
 
 
 class EmailService:
     """Handle email communications"""
 
-    def __init__(self, smtp_server: str, smtp_port: int, sender_email: str, sender_password: str):
+    def __init__(self, smtp_server: str, smtp_port: int, sender_email: str, sender_password: str,
+                 pool_size: int = 4, use_tls: bool = True):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.sender_password = sender_password
+        self.pool = SMTPConnectionPool(
+            smtp_server,
+            smtp_port,
+            sender_email,
+            sender_password,
+            max_size=pool_size,
+            use_tls=use_tls
+        )
+
+    def _build_message(self, recipient_email: str, subject: str, body: str, html: bool = False) -> MIMEMultipart:
+        """Build a MIME message"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.sender_email
+        msg['To'] = recipient_email
+
+        if html:
+            msg.attach(MIMEText(body, 'html'))
+        else:
+            msg.attach(MIMEText(body, 'plain'))
+        return msg
+
+    def _deliver(self, msg: MIMEMultipart) -> None:
+        """Send a message over a pooled session, reconnecting once if it was dropped"""
+        try:
+            with self.pool.connection() as server:
+                server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Sessions that idled as long are likely dropped too
+            logger.info("SMTP session was disconnected, reconnecting")
+            self.pool.close()
+            with self.pool.connection(fresh=True) as server:
+                server.send_message(msg)
 
     def send_email(self, recipient_email: str, subject: str, body: str, html: bool = False) -> bool:
         """Send email to recipient"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
-
-            if html:
-                msg.attach(MIMEText(body, 'html'))
-            else:
-                msg.attach(MIMEText(body, 'plain'))
-
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+            msg = self._build_message(recipient_email, subject, body, html)
+            self._deliver(msg)
 
             logger.info(f"Email sent to {recipient_email}")
             return True
@@ -147,66 +421,40 @@ class EmailService:
             logger.error(f"Failed to send email to {recipient_email}: {str(e)}")
             return False
 
+    def send_many(self, messages: List[Tuple[str, str, str, bool]]) -> List[bool]:
+        """Send many emails over the pooled sessions
+
+        Each message is a ``(recipient_email, subject, body, html)`` tuple.
+        Messages are spread over up to ``pool_size`` sessions in parallel;
+        results are returned in input order.
+        """
+        if not messages:
+            return []
+
+        workers = min(self.pool.max_size, len(messages))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as executor:
+            results = list(executor.map(lambda m: self.send_email(*m), messages))
+
+        logger.info(f"Bulk send: {sum(results)}/{len(messages)} emails sent")
+        return results
+
+    def close(self) -> None:
+        """Close pooled SMTP sessions"""
+        self.pool.close()
+
     def send_appointment_confirmation(self, customer: Customer, appointment: Appointment) -> bool:
         """Send appointment confirmation email"""
-        subject = f"Appointment Confirmation - {appointment.service_type}"
-        html_body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif;">
-                <h2>Appointment Confirmation</h2>
-                <p>Dear {customer.name},</p>
-                <p>Your appointment has been confirmed:</p>
-                <ul>
-                    <li><strong>Service:</strong> {appointment.service_type}</li>
-                    <li><strong>Date & Time:</strong> {appointment.scheduled_time.strftime('%Y-%m-%d %H:%M')}</li>
-                    <li><strong>Duration:</strong> {appointment.duration_minutes} minutes</li>
-                    {f'<li><strong>Dentist:</strong> {appointment.dentist}</li>' if appointment.dentist else ''}
-                </ul>
-                <p>If you need to reschedule, please contact us at least 24 hours before your appointment.</p>
-                <p>Best regards,<br>Makhanda Smiles Dental Practice</p>
-            </body>
-        </html>
-        """
+        subject, html_body = appointment_confirmation_email(customer, appointment)
         return self.send_email(customer.email, subject, html_body, html=True)
 
     def send_appointment_reminder(self, customer: Customer, appointment: Appointment, hours_before: int) -> bool:
         """Send appointment reminder email"""
-        subject = f"Reminder: Your appointment is in {hours_before} hours"
-        html_body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif;">
-                <h2>Appointment Reminder</h2>
-                <p>Dear {customer.name},</p>
-                <p>This is a friendly reminder about your upcoming appointment:</p>
-                <ul>
-                    <li><strong>Service:</strong> {appointment.service_type}</li>
-                    <li><strong>Date & Time:</strong> {appointment.scheduled_time.strftime('%Y-%m-%d %H:%M')}</li>
-                    <li><strong>Duration:</strong> {appointment.duration_minutes} minutes</li>
-                </ul>
-                <p>Please arrive 10 minutes early. If you need to cancel or reschedule, contact us immediately.</p>
-                <p>Best regards,<br>Makhanda Smiles Dental Practice</p>
-            </body>
-        </html>
-        """
+        subject, html_body = appointment_reminder_email(customer, appointment, hours_before)
         return self.send_email(customer.email, subject, html_body, html=True)
 
     def send_support_ticket_response(self, customer: Customer, ticket: SupportTicket, response: str) -> bool:
         """Send support ticket response email"""
-        subject = f"Re: {ticket.subject} - Support Ticket #{ticket.id}"
-        html_body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif;">
-                <h2>Support Ticket Response</h2>
-                <p>Dear {customer.name},</p>
-                <p>Thank you for contacting us. Here's our response:</p>
-                <div style="background-color: #f5f5f5; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
-                    {response}
-                </div>
-                <p>If you have any further questions, please reply to this email.</p>
-                <p>Best regards,<br>Support Team - Makhanda Smiles</p>
-            </body>
-        </html>
-        """
+        subject, html_body = support_ticket_response_email(customer, ticket, response)
         return self.send_email(customer.email, subject, html_body, html=True)
 
 
@@ -250,8 +498,315 @@ class SMSService:
 
     def send_appointment_reminder_sms(self, phone_number: str, appointment: Appointment) -> bool:
         """Send appointment reminder via SMS"""
-        message = f"Reminder: Your {appointment.service_type} appointment is on {appointment.scheduled_time.strftime('%m/%d at %H:%M')}. Reply CONFIRM to confirm or CANCEL to cancel."
-        return self.send_sms(phone_number, message)
+        return self.send_sms(phone_number, appointment_reminder_sms(appointment))
+
+    def send_many(self, messages: List[Tuple[str, str]], max_workers: int = 8) -> List[bool]:
+        """Send many SMS messages in parallel
+
+        Each message is a ``(phone_number, message)`` tuple; results are
+        returned in input order.
+        """
+        if not messages:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(messages)), thread_name_prefix="sms") as executor:
+            return list(executor.map(lambda m: self.send_sms(*m), messages))
+
+
+class AsyncEmailService:
+    """Handle email communications without blocking the event loop
+
+    Same public methods as ``EmailService`` but as coroutines, backed by a
+    pool of authenticated ``aiosmtplib`` sessions. Requires ``aiosmtplib``.
+    """
+
+    def __init__(self, smtp_server: str, smtp_port: int, sender_email: str, sender_password: str,
+                 pool_size: int = 4, use_tls: bool = True, timeout: float = 30):
+        if aiosmtplib is None:
+            raise ImportError("AsyncEmailService requires aiosmtplib: pip install aiosmtplib")
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.pool_size = max(1, pool_size)
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._idle: List[Any] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.connections_opened = 0
+
+    async def _connect(self):
+        """Open and authenticate a new SMTP session"""
+        client = aiosmtplib.SMTP(
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            start_tls=self.use_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        try:
+            if self.sender_password:
+                await client.login(self.sender_email, self.sender_password)
+        except BaseException:
+            client.close()
+            raise
+        self.connections_opened += 1
+        return client
+
+    async def _deliver_once(self, msg: MIMEMultipart) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+
+        async with self._slots:
+            client = None
+            while self._idle and client is None:
+                client = self._idle.pop()
+                if not client.is_connected:
+                    client = None
+            if client is None:
+                client = await self._connect()
+
+            try:
+                await client.send_message(msg)
+            except (aiosmtplib.SMTPServerDisconnected, OSError):
+                client.close()
+                raise
+            except Exception:
+                self._idle.append(client)
+                raise
+            except BaseException:
+                # Cancelled mid-transaction: the session can't be reused
+                client.close()
+                raise
+            self._idle.append(client)
+
+    async def _deliver(self, msg: MIMEMultipart) -> None:
+        """Send a message over a pooled session, reconnecting once if it was dropped"""
+        try:
+            await self._deliver_once(msg)
+        except aiosmtplib.SMTPServerDisconnected:
+            logger.info("SMTP session was disconnected, reconnecting")
+            await self._deliver_once(msg)
+
+    async def send_email(self, recipient_email: str, subject: str, body: str, html: bool = False) -> bool:
+        """Send email to recipient"""
+        try:
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = subject
+            msg['From'] = self.sender_email
+            msg['To'] = recipient_email
+            msg.attach(MIMEText(body, 'html' if html else 'plain'))
+
+            await self._deliver(msg)
+
+            logger.info(f"Email sent to {recipient_email}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to send email to {recipient_email}: {str(e)}")
+            return False
+
+    async def send_many(self, messages: List[Tuple[str, str, str, bool]]) -> List[bool]:
+        """Send many emails concurrently over the pooled sessions"""
+        results = list(await asyncio.gather(*(self.send_email(*m) for m in messages)))
+        if messages:
+            logger.info(f"Bulk send: {sum(results)}/{len(messages)} emails sent")
+        return results
+
+    async def send_appointment_confirmation(self, customer: Customer, appointment: Appointment) -> bool:
+        """Send appointment confirmation email"""
+        subject, html_body = appointment_confirmation_email(customer, appointment)
+        return await self.send_email(customer.email, subject, html_body, html=True)
+
+    async def send_appointment_reminder(self, customer: Customer, appointment: Appointment, hours_before: int) -> bool:
+        """Send appointment reminder email"""
+        subject, html_body = appointment_reminder_email(customer, appointment, hours_before)
+        return await self.send_email(customer.email, subject, html_body, html=True)
+
+    async def send_support_ticket_response(self, customer: Customer, ticket: SupportTicket, response: str) -> bool:
+        """Send support ticket response email"""
+        subject, html_body = support_ticket_response_email(customer, ticket, response)
+        return await self.send_email(customer.email, subject, html_body, html=True)
+
+    async def close(self) -> None:
+        """Close pooled SMTP sessions"""
+        while self._idle:
+            client = self._idle.pop()
+            try:
+                await client.quit()
+            except Exception:
+                client.close()
+
+
+class AsyncSMSService:
+    """Handle SMS communications without blocking the event loop
+
+    Same public methods as ``SMSService`` but as coroutines, sent over a
+    keep-alive ``httpx.AsyncClient`` connection pool. Requires ``httpx``.
+    """
+
+    def __init__(self, api_key: str, api_url: str = "https://api.twilio.com",
+                 max_connections: int = 20, timeout: float = 10):
+        if httpx is None:
+            raise ImportError("AsyncSMSService requires httpx: pip install httpx")
+        self.api_key = api_key
+        self.api_url = api_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client = None
+
+    def _get_client(self):
+        """Create the pooled HTTP client on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def send_sms(self, phone_number: str, message: str) -> bool:
+        """Send SMS message"""
+        try:
+            payload = {
+                "to": phone_number,
+                "body": message,
+                "from": "+1234567890"  # Your Twilio number
+            }
+
+            response = await self._get_client().post("/messages", json=payload)
+
+            if response.status_code in [200, 201]:
+                logger.info(f"SMS sent to {phone_number}")
+                return True
+            else:
+                logger.error(f"Failed to send SMS: {response.text}")
+                return False
+        except Exception as e:
+            logger.error(f"SMS service error: {str(e)}")
+            return False
+
+    async def send_appointment_reminder_sms(self, phone_number: str, appointment: Appointment) -> bool:
+        """Send appointment reminder via SMS"""
+        return await self.send_sms(phone_number, appointment_reminder_sms(appointment))
+
+    async def send_many(self, messages: List[Tuple[str, str]]) -> List[bool]:
+        """Send many SMS messages concurrently over the pooled connections"""
+        return list(await asyncio.gather(*(self.send_sms(*m) for m in messages)))
+
+    async def close(self) -> None:
+        """Close pooled HTTP connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OutboundBatcher:
+    """Collect outbound messages and hand them to a bulk ``send_many`` call
+
+    ``submit`` waits for the result of its own message. A batch is sent as
+    soon as ``batch_size`` messages are queued, or ``linger_seconds`` after
+    the first one otherwise.
+    """
+
+    def __init__(self, send_many: Callable, batch_size: int = 100, linger_seconds: float = 0.005):
+        self.send_many = send_many
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set = set()
+        self.batches_sent = 0
+
+    async def submit(self, item: Any) -> bool:
+        """Queue a message and wait until its batch has been sent"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger_seconds, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        job = asyncio.ensure_future(self._send(batch))
+        self._in_flight.add(job)
+        job.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await call_service(self.send_many, [item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"Bulk send of {len(batch)} messages failed: {str(e)}")
+            results = [False] * len(batch)
+
+        self.batches_sent += 1
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Send anything still queued and wait for in-flight batches"""
+        self._flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+
+
+class BatchingEmailService:
+    """Email service facade that routes every message through an ``OutboundBatcher``"""
+
+    def __init__(self, email_service, batch_size: int = 100):
+        self.batcher = OutboundBatcher(email_service.send_many, batch_size)
+
+    async def send_email(self, recipient_email: str, subject: str, body: str, html: bool = False) -> bool:
+        return await self.batcher.submit((recipient_email, subject, body, html))
+
+    async def send_appointment_confirmation(self, customer: Customer, appointment: Appointment) -> bool:
+        subject, html_body = appointment_confirmation_email(customer, appointment)
+        return await self.send_email(customer.email, subject, html_body, html=True)
+
+    async def send_appointment_reminder(self, customer: Customer, appointment: Appointment, hours_before: int) -> bool:
+        subject, html_body = appointment_reminder_email(customer, appointment, hours_before)
+        return await self.send_email(customer.email, subject, html_body, html=True)
+
+    async def send_support_ticket_response(self, customer: Customer, ticket: SupportTicket, response: str) -> bool:
+        subject, html_body = support_ticket_response_email(customer, ticket, response)
+        return await self.send_email(customer.email, subject, html_body, html=True)
+
+    async def close(self) -> None:
+        await self.batcher.close()
+
+
+class BatchingSMSService:
+    """SMS service facade that routes every message through an ``OutboundBatcher``"""
+
+    def __init__(self, sms_service, batch_size: int = 100):
+        self.batcher = OutboundBatcher(sms_service.send_many, batch_size)
+
+    async def send_sms(self, phone_number: str, message: str) -> bool:
+        return await self.batcher.submit((phone_number, message))
+
+    async def send_appointment_reminder_sms(self, phone_number: str, appointment: Appointment) -> bool:
+        return await self.send_sms(phone_number, appointment_reminder_sms(appointment))
+
+    async def close(self) -> None:
+        await self.batcher.close()
 
 
 class WorkflowTask(ABC):
@@ -281,7 +836,7 @@ class SendAppointmentConfirmationTask(WorkflowTask):
         if not customer or not appointment:
             return {'success': False, 'error': 'Missing customer or appointment data'}
 
-        result = self.email_service.send_appointment_confirmation(customer, appointment)
+        result = await call_service(self.email_service.send_appointment_confirmation, customer, appointment)
         return {
             'success': result,
             'task': self.get_name(),
@@ -307,11 +862,13 @@ class SendAppointmentReminderTask(WorkflowTask):
         if not customer or not appointment:
             return {'success': False, 'error': 'Missing customer or appointment data'}
 
-        email_result = self.email_service.send_appointment_reminder(customer, appointment, hours_before)
-        
-        sms_result = True
+        sends = [call_service(self.email_service.send_appointment_reminder, customer, appointment, hours_before)]
         if self.sms_service:
-            sms_result = self.sms_service.send_appointment_reminder_sms(customer.phone, appointment)
+            sends.append(call_service(self.sms_service.send_appointment_reminder_sms, customer.phone, appointment))
+
+        results = await asyncio.gather(*sends)
+        email_result = results[0]
+        sms_result = results[1] if self.sms_service else True
 
         return {
             'success': email_result and sms_result,
@@ -348,7 +905,7 @@ class ResolveSupportTicketTask(WorkflowTask):
         response = self._get_response(ticket.description.lower())
         
         if response:
-            result = self.email_service.send_support_ticket_response(customer, ticket, response)
+            result = await call_service(self.email_service.send_support_ticket_response, customer, ticket, response)
             return {
                 'success': result,
                 'task': self.get_name(),
@@ -419,7 +976,7 @@ class NotifyStaffTask(WorkflowTask):
         subject = f"Staff Notification: {notification_type.title()} - {appointment.service_type}"
         body = f"Appointment ID: {appointment.id}\nService: {appointment.service_type}\nTime: {appointment.scheduled_time}"
 
-        result = self.email_service.send_email(staff_email, subject, body)
+        result = await call_service(self.email_service.send_email, staff_email, subject, body)
 
         return {
             'success': result,
@@ -433,43 +990,118 @@ class NotifyStaffTask(WorkflowTask):
 
 
 class Workflow:
-    """Workflow execution engine"""
-
-    def __init__(self, name: str, tasks: List[WorkflowTask]):
+    """Workflow execution engine
+
+    Tasks form a DAG: ``dependencies`` maps a task name to the names of the
+    tasks it must wait for, and tasks whose dependencies are done run
+    concurrently. Without ``dependencies`` tasks run one after another in
+    list order. A failed dependency does not stop its dependents, matching
+    the sequential behaviour. ``task_timeout`` bounds each task.
+    """
+
+    def __init__(self, name: str, tasks: List[WorkflowTask],
+                 dependencies: Optional[Dict[str, List[str]]] = None,
+                 task_timeout: Optional[float] = None):
         self.name = name
         self.tasks = tasks
+        self.dependencies = dependencies
+        self.task_timeout = task_timeout
         self.status = WorkflowStatus.PENDING
         self.results = []
         self.created_at = datetime.now()
         self.started_at = None
         self.completed_at = None
+        self.critical_path: List[int] = []
+        self._finished_at: List[float] = []
+        self._upstream = self._build_graph()
+
+    def _build_graph(self) -> List[List[int]]:
+        """Resolve dependencies to task indices and reject cycles"""
+        if self.dependencies is None:
+            return [[i - 1] if i else [] for i in range(len(self.tasks))]
+
+        names = [task.get_name() for task in self.tasks]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Workflow {self.name} has duplicate task names: {names}")
+        index = {name: i for i, name in enumerate(names)}
+
+        upstream = [[] for _ in self.tasks]
+        for name, deps in self.dependencies.items():
+            for dep in [name, *deps]:
+                if dep not in index:
+                    raise ValueError(f"Workflow {self.name} has no task named {dep}")
+            upstream[index[name]] = [index[dep] for dep in deps]
+
+        # Kahn's algorithm: every task must become ready exactly once
+        remaining = [len(deps) for deps in upstream]
+        downstream = [[] for _ in self.tasks]
+        for i, deps in enumerate(upstream):
+            for dep in deps:
+                downstream[dep].append(i)
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        visited = 0
+        while ready:
+            i = ready.pop()
+            visited += 1
+            for j in downstream[i]:
+                remaining[j] -= 1
+                if remaining[j] == 0:
+                    ready.append(j)
+        if visited != len(self.tasks):
+            raise ValueError(f"Workflow {self.name} has a dependency cycle")
+
+        return upstream
+
+    async def _run_task(self, task: WorkflowTask, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one task, recording its timing"""
+        logger.info(f"Executing task: {task.get_name()}")
+        started_at = datetime.now()
+        start = time.perf_counter()
+
+        try:
+            result = await asyncio.wait_for(task.execute(context), self.task_timeout)
+            result.setdefault('task', task.get_name())
+
+            if not result.get('success', False):
+                logger.warning(f"Task {task.get_name()} failed: {result.get('error', 'Unknown error')}")
+        except Exception as e:
+            error = f"timed out after {self.task_timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            logger.error(f"Task {task.get_name()} error: {error}")
+            result = {
+                'success': False,
+                'task': task.get_name(),
+                'error': error,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        result['started_at'] = started_at.isoformat()
+        result['completed_at'] = datetime.now().isoformat()
+        result['duration_seconds'] = time.perf_counter() - start
+        return result
 
     async def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute all workflow tasks"""
         self.status = WorkflowStatus.RUNNING
         self.started_at = datetime.now()
         self.results = []
+        self.critical_path = []
+        self._finished_at = [0.0] * len(self.tasks)
 
         logger.info(f"Starting workflow: {self.name}")
 
         try:
-            for task in self.tasks:
-                logger.info(f"Executing task: {task.get_name()}")
-                
-                try:
-                    result = await task.execute(context)
-                    self.results.append(result)
-                    
-                    if not result.get('success', False):
-                        logger.warning(f"Task {task.get_name()} failed: {result.get('error', 'Unknown error')}")
-                except Exception as e:
-                    logger.error(f"Task {task.get_name()} error: {str(e)}")
-                    self.results.append({
-                        'success': False,
-                        'task': task.get_name(),
-                        'error': str(e),
-                        'timestamp': datetime.now().isoformat()
-                    })
+            runs: List[asyncio.Task] = []
+
+            async def run(i: int) -> Dict[str, Any]:
+                for dep in self._upstream[i]:
+                    await runs[dep]
+                result = await self._run_task(self.tasks[i], context)
+                self._finished_at[i] = time.perf_counter()
+                return result
+
+            runs.extend(asyncio.ensure_future(run(i)) for i in range(len(self.tasks)))
+            self.results = list(await asyncio.gather(*runs))
+            self._mark_critical_path()
 
             self.status = WorkflowStatus.COMPLETED
             self.completed_at = datetime.now()
@@ -482,8 +1114,23 @@ class Workflow:
 
         return self.get_summary()
 
+    def _mark_critical_path(self) -> None:
+        """Find the dependency chain that finished last"""
+        finished = self._finished_at
+        if not finished:
+            return
+
+        i = max(range(len(finished)), key=finished.__getitem__)
+        while True:
+            self.critical_path.append(i)
+            if not self._upstream[i]:
+                break
+            i = max(self._upstream[i], key=finished.__getitem__)
+        self.critical_path.reverse()
+
     def get_summary(self) -> Dict[str, Any]:
         """Get workflow execution summary"""
+        critical_path = self.critical_path
         return {
             'workflow_name': self.name,
             'status': self.status.value,
@@ -493,44 +1140,257 @@ class Workflow:
             'duration_seconds': (self.completed_at - self.started_at).total_seconds() if self.started_at and self.completed_at else None,
             'tasks_executed': len(self.results),
             'tasks_successful': sum(1 for r in self.results if r.get('success', False)),
+            'critical_path': [self.tasks[i].get_name() for i in critical_path],
+            'critical_path_seconds': sum(self.results[i]['duration_seconds'] for i in critical_path),
             'results': self.results
         }
 
 
+class AppointmentIndex:
+    """Secondary indexes over appointments
+
+    Maintains appointment ids by customer, by status and sorted by
+    ``scheduled_time``. The indexed values are snapshotted on ``add`` so
+    an entry can be removed even after the appointment object changed.
+    """
+
+    def __init__(self):
+        self.by_customer: Dict[str, set] = {}
+        self.by_status: Dict[AppointmentStatus, set] = {}
+        self._by_time: List[Tuple[datetime, str]] = []
+        self._keys: Dict[str, Tuple[str, datetime, AppointmentStatus]] = {}
+
+    def add(self, appointment: Appointment) -> None:
+        """Index an appointment, replacing its previous entries"""
+        self.remove(appointment.id)
+        self._index(appointment)
+        bisect.insort(self._by_time, (appointment.scheduled_time, appointment.id))
+
+    def add_many(self, appointments: List[Appointment]) -> None:
+        """Index many appointments, sorting the time index once"""
+        # The last record wins when a batch repeats an id
+        latest = {appointment.id: appointment for appointment in appointments}
+        # Drop prior entries first, while the time index is still sorted for remove()
+        for appointment_id in latest:
+            self.remove(appointment_id)
+        for appointment in latest.values():
+            self._index(appointment)
+            self._by_time.append((appointment.scheduled_time, appointment.id))
+        self._by_time.sort()
+
+    def _index(self, appointment: Appointment) -> None:
+        self._keys[appointment.id] = (appointment.customer_id, appointment.scheduled_time, appointment.status)
+        self.by_customer.setdefault(appointment.customer_id, set()).add(appointment.id)
+        self.by_status.setdefault(appointment.status, set()).add(appointment.id)
+
+    def remove(self, appointment_id: str) -> None:
+        """Drop an appointment from every index"""
+        keys = self._keys.pop(appointment_id, None)
+        if keys is None:
+            return
+
+        customer_id, scheduled_time, status = keys
+        _discard(self.by_customer, customer_id, appointment_id)
+        _discard(self.by_status, status, appointment_id)
+        entry = (scheduled_time, appointment_id)
+        i = bisect.bisect_left(self._by_time, entry)
+        if i < len(self._by_time) and self._by_time[i] == entry:
+            del self._by_time[i]
+
+    def between(self, start: datetime, end: datetime) -> List[str]:
+        """Ids of appointments with ``start <= scheduled_time < end``, in time order"""
+        lo = bisect.bisect_left(self._by_time, (start,))
+        hi = bisect.bisect_left(self._by_time, (end,))
+        return [appointment_id for _, appointment_id in self._by_time[lo:hi]]
+
+
+class TicketIndex:
+    """Secondary indexes over support tickets by status, priority and customer"""
+
+    def __init__(self):
+        self.by_status: Dict[SupportTicketStatus, set] = {}
+        self.by_priority: Dict[str, set] = {}
+        self.by_customer: Dict[str, set] = {}
+        self._keys: Dict[str, Tuple[SupportTicketStatus, str, str]] = {}
+
+    def add(self, ticket: SupportTicket) -> None:
+        """Index a ticket, replacing its previous entries"""
+        self.remove(ticket.id)
+        self._keys[ticket.id] = (ticket.status, ticket.priority, ticket.customer_id)
+        self.by_status.setdefault(ticket.status, set()).add(ticket.id)
+        self.by_priority.setdefault(ticket.priority, set()).add(ticket.id)
+        self.by_customer.setdefault(ticket.customer_id, set()).add(ticket.id)
+
+    def remove(self, ticket_id: str) -> None:
+        """Drop a ticket from every index"""
+        keys = self._keys.pop(ticket_id, None)
+        if keys is None:
+            return
+
+        status, priority, customer_id = keys
+        _discard(self.by_status, status, ticket_id)
+        _discard(self.by_priority, priority, ticket_id)
+        _discard(self.by_customer, customer_id, ticket_id)
+
+
+def _discard(index: Dict[Any, set], key: Any, item_id: str) -> None:
+    """Remove an id from an index bucket, dropping the bucket when empty"""
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.discard(item_id)
+        if not bucket:
+            del index[key]
+
+
+class WorkflowHistory:
+    """Bounded store of executed workflow summaries
+
+    Keeps the most recent ``max_entries`` summaries in memory (all of them
+    if ``None``) while counters per status, per workflow name and per task
+    are maintained on every append, so statistics never scan the history.
+    With ``log_path`` every summary is also appended to a JSON-lines file
+    for long-term audit.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10_000, log_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.log_path = log_path
+        self._entries: deque = deque(maxlen=max_entries)
+        self.total = 0
+        self.by_status: Counter = Counter()
+        self.by_workflow: Dict[str, Counter] = {}
+        self.by_task: Dict[str, Counter] = {}
+        self._log = open(log_path, 'a', encoding='utf-8') if log_path else None
+
+    def append(self, summary: Dict[str, Any]) -> None:
+        """Record an executed workflow summary"""
+        self._record(summary)
+        if self._log is not None:
+            self._log.flush()
+
+    def extend(self, summaries: List[Dict[str, Any]]) -> None:
+        """Record several executed workflow summaries"""
+        for summary in summaries:
+            self._record(summary)
+        if self._log is not None:
+            self._log.flush()
+
+    def _record(self, summary: Dict[str, Any]) -> None:
+        status = summary.get('status')
+        self.total += 1
+        self.by_status[status] += 1
+        self.by_workflow.setdefault(summary.get('workflow_name'), Counter())[status] += 1
+        for result in summary.get('results', []):
+            outcome = 'successful' if result.get('success', False) else 'failed'
+            self.by_task.setdefault(result.get('task', 'unknown'), Counter())[outcome] += 1
+
+        self._entries.append(summary)
+        if self._log is not None:
+            self._log.write(json.dumps(summary, default=str) + '\n')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._entries)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self._entries[index]
+
+    def iter_log(self) -> Iterator[Dict[str, Any]]:
+        """Stream every summary from the on-disk log, oldest first"""
+        if not self.log_path:
+            return
+        if self._log is not None:
+            self._log.flush()
+        with open(self.log_path, encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get counters over every workflow recorded, including evicted ones"""
+        return {
+            'total_workflows_executed': self.total,
+            'successful_workflows': self.by_status['completed'],
+            'failed_workflows': self.by_status['failed'],
+            'workflows_retained': len(self._entries),
+            'workflows_by_name': {name: dict(counts) for name, counts in self.by_workflow.items()},
+            'tasks_by_name': {name: dict(counts) for name, counts in self.by_task.items()}
+        }
+
+    def close(self) -> None:
+        """Close the on-disk log"""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
 class WorkflowEngine:
     """Main workflow automation engine"""
 
-    def __init__(self):
+    POINTS_PER_SERVICE = {
+        'General Checkup': 10,
+        'Teeth Cleaning': 15,
+        'Teeth Whitening': 25,
+        'Dental Fillings': 20,
+        'Root Canal': 50,
+        'Dental Crown': 60,
+        'Dental Implants': 100
+    }
+    STAFF_EMAIL = 'staff@makhanda-smiles.com'
+
+    def __init__(self, email_service=None, sms_service=None,
+                 history_size: Optional[int] = 10_000, history_log_path: Optional[str] = None):
         self.workflows: Dict[str, Workflow] = {}
         self.customers: Dict[str, Customer] = {}
         self.appointments: Dict[str, Appointment] = {}
         self.tickets: Dict[str, SupportTicket] = {}
-        self.executed_workflows: List[Dict[str, Any]] = []
+        self.appointment_index = AppointmentIndex()
+        self.ticket_index = TicketIndex()
+        self.executed_workflows = WorkflowHistory(history_size, history_log_path)
+        self.email_service = email_service
+        self.sms_service = sms_service
+
+    def _build_workflow(self, workflow_name: str, email_service,
+                        sms_service=None) -> Tuple[Workflow, Dict[str, Any]]:
+        """Build a named workflow and its default context"""
+        if workflow_name == "AppointmentScheduled":
+            tasks = [
+                SendAppointmentConfirmationTask(email_service),
+                UpdateLoyaltyPointsTask(),
+                NotifyStaffTask(email_service)
+            ]
+            # Confirmation, loyalty update and staff notification are independent
+            workflow = Workflow(workflow_name, tasks, dependencies={
+                'SendAppointmentConfirmation': [],
+                'UpdateLoyaltyPoints': [],
+                'NotifyStaff': []
+            })
+            defaults = {
+                'points_per_service': self.POINTS_PER_SERVICE,
+                'staff_email': self.STAFF_EMAIL
+            }
+        elif workflow_name == "AppointmentReminder":
+            tasks = [SendAppointmentReminderTask(email_service, sms_service)]
+            workflow = Workflow(workflow_name, tasks)
+            defaults = {'hours_before': 24}
+        elif workflow_name == "SupportTicketHandling":
+            tasks = [ResolveSupportTicketTask(email_service)]
+            workflow = Workflow(workflow_name, tasks)
+            defaults = {}
+        else:
+            raise ValueError(f"Unknown workflow: {workflow_name}")
+
+        return workflow, defaults
 
     async def schedule_appointment_workflow(self, customer: Customer, appointment: Appointment, 
                                           email_service: EmailService) -> Dict[str, Any]:
         """Execute workflow for new appointment"""
-        tasks = [
-            SendAppointmentConfirmationTask(email_service),
-            UpdateLoyaltyPointsTask(),
-            NotifyStaffTask(email_service)
-        ]
-
-        workflow = Workflow("AppointmentScheduled", tasks)
-        context = {
+        workflow, context = self._build_workflow("AppointmentScheduled", email_service)
+        context.update({
             'customer': customer,
-            'appointment': appointment,
-            'points_per_service': {
-                'General Checkup': 10,
-                'Teeth Cleaning': 15,
-                'Teeth Whitening': 25,
-                'Dental Fillings': 20,
-                'Root Canal': 50,
-                'Dental Crown': 60,
-                'Dental Implants': 100
-            },
-            'staff_email': 'staff@makhanda-smiles.com'
-        }
+            'appointment': appointment
+        })
 
         result = await workflow.execute(context)
         self.executed_workflows.append(result)
@@ -541,16 +1401,12 @@ class WorkflowEngine:
                                         sms_service: Optional[SMSService] = None,
                                         hours_before: int = 24) -> Dict[str, Any]:
         """Execute workflow for appointment reminders"""
-        tasks = [
-            SendAppointmentReminderTask(email_service, sms_service)
-        ]
-
-        workflow = Workflow("AppointmentReminder", tasks)
-        context = {
+        workflow, context = self._build_workflow("AppointmentReminder", email_service, sms_service)
+        context.update({
             'customer': customer,
             'appointment': appointment,
             'hours_before': hours_before
-        }
+        })
 
         result = await workflow.execute(context)
         self.executed_workflows.append(result)
@@ -559,20 +1415,72 @@ class WorkflowEngine:
     async def handle_support_ticket_workflow(self, customer: Customer, ticket: SupportTicket,
                                            email_service: EmailService) -> Dict[str, Any]:
         """Execute workflow for support ticket handling"""
-        tasks = [
-            ResolveSupportTicketTask(email_service)
-        ]
-
-        workflow = Workflow("SupportTicketHandling", tasks)
-        context = {
+        workflow, context = self._build_workflow("SupportTicketHandling", email_service)
+        context.update({
             'customer': customer,
             'ticket': ticket
-        }
+        })
 
         result = await workflow.execute(context)
         self.executed_workflows.append(result)
         return result
 
+    async def run_batch(self, workflow_name: str, contexts: List[Dict[str, Any]],
+                        max_concurrency: int = 100, batch_size: int = 100) -> Dict[str, Any]:
+        """Run one workflow for many contexts and return an aggregated summary
+
+        Task instances are built once and shared by every run. Outbound
+        emails and SMS are collected per transport and sent with
+        ``send_many`` in batches of ``batch_size``. At most
+        ``max_concurrency`` workflows run at a time. Uses the engine's
+        ``email_service`` and ``sms_service``; steps needing a missing one
+        fail as they would in a single workflow run.
+        """
+        started_at = datetime.now()
+        start = time.perf_counter()
+
+        email_service = BatchingEmailService(self.email_service, batch_size) if self.email_service else None
+        sms_service = BatchingSMSService(self.sms_service, batch_size) if self.sms_service else None
+        template, defaults = self._build_workflow(workflow_name, email_service, sms_service)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(context: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                workflow = Workflow(workflow_name, template.tasks, template.dependencies,
+                                    template.task_timeout)
+                return await workflow.execute({**defaults, **context})
+
+        try:
+            summaries = await asyncio.gather(*(run_one(context) for context in contexts))
+        finally:
+            if email_service:
+                await email_service.close()
+            if sms_service:
+                await sms_service.close()
+
+        self.executed_workflows.extend(summaries)
+
+        task_stats: Dict[str, Dict[str, int]] = {}
+        for summary in summaries:
+            for result in summary['results']:
+                stats = task_stats.setdefault(result.get('task', 'unknown'), {'successful': 0, 'failed': 0})
+                stats['successful' if result.get('success', False) else 'failed'] += 1
+
+        return {
+            'workflow_name': workflow_name,
+            'started_at': started_at.isoformat(),
+            'duration_seconds': time.perf_counter() - start,
+            'total_workflows': len(summaries),
+            'completed_workflows': sum(1 for w in summaries if w['status'] == 'completed'),
+            'failed_workflows': sum(1 for w in summaries if w['status'] == 'failed'),
+            'tasks_executed': sum(w['tasks_executed'] for w in summaries),
+            'tasks_successful': sum(w['tasks_successful'] for w in summaries),
+            'task_stats': task_stats,
+            'email_batches_sent': email_service.batcher.batches_sent if email_service else 0,
+            'sms_batches_sent': sms_service.batcher.batches_sent if sms_service else 0,
+            'results': summaries
+        }
+
     def add_customer(self, customer: Customer) -> bool:
         """Add customer to system"""
         self.customers[customer.id] = customer
@@ -582,18 +1490,117 @@ class WorkflowEngine:
     def add_appointment(self, appointment: Appointment) -> bool:
         """Add appointment to system"""
         self.appointments[appointment.id] = appointment
+        self.appointment_index.add(appointment)
         logger.info(f"Appointment added: {appointment.id}")
         return True
 
+    def add_appointments(self, appointments: List[Appointment]) -> int:
+        """Add many appointments to system at once"""
+        for appointment in appointments:
+            self.appointments[appointment.id] = appointment
+        self.appointment_index.add_many(appointments)
+        logger.info(f"{len(appointments)} appointments added")
+        return len(appointments)
+
+    def remove_appointment(self, appointment_id: str) -> bool:
+        """Remove appointment from system"""
+        if self.appointments.pop(appointment_id, None) is None:
+            return False
+        self.appointment_index.remove(appointment_id)
+        logger.info(f"Appointment removed: {appointment_id}")
+        return True
+
+    def update_appointment_status(self, appointment_id: str, status: AppointmentStatus) -> bool:
+        """Change an appointment's status"""
+        appointment = self.appointments.get(appointment_id)
+        if not appointment:
+            return False
+        appointment.status = status
+        self.appointment_index.add(appointment)
+        return True
+
+    def reschedule_appointment(self, appointment_id: str, scheduled_time: datetime) -> bool:
+        """Move an appointment to a new time"""
+        appointment = self.appointments.get(appointment_id)
+        if not appointment:
+            return False
+        appointment.scheduled_time = scheduled_time
+        self.appointment_index.add(appointment)
+        return True
+
+    def reindex_appointment(self, appointment_id: str) -> None:
+        """Refresh indexes after an appointment object was modified directly"""
+        appointment = self.appointments.get(appointment_id)
+        if appointment:
+            self.appointment_index.add(appointment)
+
+    def get_customer_appointments(self, customer_id: str) -> List[Appointment]:
+        """Get a customer's appointments ordered by time"""
+        ids = self.appointment_index.by_customer.get(customer_id, ())
+        return sorted((self.appointments[i] for i in ids), key=lambda a: a.scheduled_time)
+
+    def get_appointments_between(self, start: datetime, end: datetime,
+                                 status: Optional[AppointmentStatus] = None) -> List[Appointment]:
+        """Get appointments with ``start <= scheduled_time < end`` ordered by time"""
+        ids = self.appointment_index.between(start, end)
+        if status is not None:
+            wanted = self.appointment_index.by_status.get(status, set())
+            ids = [i for i in ids if i in wanted]
+        return [self.appointments[i] for i in ids]
+
+    def get_appointments_by_status(self, status: AppointmentStatus) -> List[Appointment]:
+        """Get appointments with the given status"""
+        return [self.appointments[i] for i in self.appointment_index.by_status.get(status, ())]
+
     def add_ticket(self, ticket: SupportTicket) -> bool:
         """Add support ticket to system"""
         self.tickets[ticket.id] = ticket
+        self.ticket_index.add(ticket)
         logger.info(f"Support ticket added: {ticket.id}")
         return True
 
+    def update_ticket_status(self, ticket_id: str, status: SupportTicketStatus) -> bool:
+        """Change a support ticket's status"""
+        ticket = self.tickets.get(ticket_id)
+        if not ticket:
+            return False
+        ticket.status = status
+        ticket.updated_at = datetime.now()
+        self.ticket_index.add(ticket)
+        return True
+
+    def update_ticket_priority(self, ticket_id: str, priority: str) -> bool:
+        """Change a support ticket's priority"""
+        ticket = self.tickets.get(ticket_id)
+        if not ticket:
+            return False
+        ticket.priority = priority
+        ticket.updated_at = datetime.now()
+        self.ticket_index.add(ticket)
+        return True
+
+    def get_tickets(self, status: Optional[SupportTicketStatus] = None,
+                    priority: Optional[str] = None,
+                    customer_id: Optional[str] = None) -> List[SupportTicket]:
+        """Get support tickets matching every given filter"""
+        index = self.ticket_index
+        buckets = []
+        if status is not None:
+            buckets.append(index.by_status.get(status, set()))
+        if priority is not None:
+            buckets.append(index.by_priority.get(priority, set()))
+        if customer_id is not None:
+            buckets.append(index.by_customer.get(customer_id, set()))
+        if not buckets:
+            return list(self.tickets.values())
+
+        buckets.sort(key=len)
+        ids = buckets[0].intersection(*buckets[1:])
+        return [self.tickets[i] for i in ids]
+
     def get_workflow_history(self) -> List[Dict[str, Any]]:
-        """Get executed workflow history"""
-        return self.executed_workflows
+        """Get executed workflow history (most recent ``history_size`` entries)"""
+        return list(self.executed_workflows)
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get system statistics"""
@@ -601,7 +1608,5 @@ class WorkflowEngine:
             'total_customers': len(self.customers),
             'total_appointments': len(self.appointments),
             'total_support_tickets': len(self.tickets),
-            'total_workflows_executed': len(self.executed_workflows),
-            'successful_workflows': sum(1 for w in self.executed_workflows if w['status'] == 'completed'),
-            'failed_workflows': sum(1 for w in self.executed_workflows if w['status'] == 'failed')
+            **self.executed_workflows.get_statistics()
         }
@@ -0,0 +1,147 @@
+"""
+Two-tier answer cache for the /chat endpoint
+
+Tier 1 matches the normalized question text exactly. Tier 2 reuses an answer
+when the question's embedding is within a cosine similarity threshold of a
+cached question. Entries expire after a TTL, the least recently used entry is
+evicted when full, and everything is dropped when the knowledge base version
+changes.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question):
+    """Lower-case, strip punctuation and collapse whitespace"""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", question.lower())).strip()
+
+
+class _Entry:
+    __slots__ = ("answer", "vector", "expires_at")
+
+    def __init__(self, answer, vector, expires_at):
+        self.answer = answer
+        self.vector = vector
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    """Thread-safe exact + semantic answer cache with TTL/LRU eviction"""
+
+    def __init__(self, max_entries=1000, ttl_seconds=3600, similarity_threshold=0.95,
+                 version_source=None, version_check_interval=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.version_source = version_source
+        self.version_check_interval = version_check_interval
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._matrix_keys = []
+        self._version = None
+        self._version_checked_at = None
+
+    def get(self, question):
+        """Return a cached answer for the exact (normalized) question, or None"""
+        self._check_version()
+        key = normalize_question(question)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits["exact"] += 1
+            return entry.answer
+
+    def get_similar(self, embedding):
+        """Return the answer of the most similar cached question above the threshold"""
+        query = self._unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+            if self._matrix is None:
+                self._matrix_keys = list(self._entries)
+                self._matrix = np.stack([self._entries[k].vector for k in self._matrix_keys])
+            scores = self._matrix @ query
+            for index in np.argsort(scores)[::-1]:
+                if scores[index] < self.similarity_threshold:
+                    break
+                key = self._matrix_keys[index]
+                entry = self._entries[key]
+                if entry.expires_at <= now:
+                    continue
+                self._entries.move_to_end(key)
+                self.hits["semantic"] += 1
+                return entry.answer
+            self.misses += 1
+            return None
+
+    def put(self, question, embedding, answer):
+        """Cache an answer under the question text and its embedding"""
+        key = normalize_question(question)
+        entry = _Entry(answer, self._unit(embedding), time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._matrix = None
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.hits["exact"],
+            "semantic_hits": self.hits["semantic"],
+            "misses": self.misses,
+            "kb_version": self._version,
+        }
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._matrix = None
+
+    def _check_version(self):
+        if self.version_source is None:
+            return
+        now = time.monotonic()
+        if self._version_checked_at is not None and \
+           now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = self.version_source()
+        if version is None:
+            return
+        if self._version is not None and version != self._version:
+            print(f"Knowledge base changed (version {self._version} -> {version}), clearing answer cache")
+            self.clear()
+        self._version = version
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
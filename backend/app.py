@@ -1,20 +1,36 @@
 import os
+import json
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain.chains import RetrievalQA
-from langchain_community.vectorstores import SupabaseVectorStore
-from supabase.client import create_client
 from dotenv import load_dotenv
+from answer_cache import AnswerCache, normalize_question
+from concurrency import InFlightLimiter, Overloaded, SingleFlight
+from metrics import LatencyTracker
+from knowledge_base import KB_TABLE, KB_QUERY, get_kb_version
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Build the chain in the background so the first question doesn't pay for it;
+    # health checks answer straight away either way
+    if os.getenv("CHAT_WARMUP", "1") == "1":
+        asyncio.get_running_loop().run_in_executor(chat_executor, warm_up)
+    yield
+    chat_executor.shutdown(wait=False)
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 def health_check():
-    return {"status": "online"}
+    return {"status": "online", "ready": chat_components is not None}
 
 # --- PRODUCTION CORS SETUP ---
 # For development we allow localhost, for production this should be restricted
@@ -26,32 +42,242 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Supabase & Gemini
-# Ensure you have SUPABASE_URL and SUPABASE_KEY in your .env file
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+# --- LAZY INITIALIZATION ---
+# The Supabase client, Gemini clients and RetrievalQA chain (and their imports)
+# are built on first use, not at import, so a cold start can pass health checks
+# immediately and a bad key or unreachable Supabase fails requests, not the process.
+class ChatComponents:
+    def __init__(self):
+        from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+        from langchain.chains import RetrievalQA
+        from langchain_community.vectorstores import SupabaseVectorStore
+        from supabase.client import create_client
+        from embedding_cache import CachedEmbeddings, DEFAULT_CACHE_PATH
+        from local_index import LocalVectorIndex, LocalKBRetriever
+
+        # Ensure you have SUPABASE_URL and SUPABASE_KEY in your .env file
+        self.supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+        # Query embeddings are cached on disk (shared with ingest.py) so repeated
+        # questions don't call the embedding API
+        self.embeddings = CachedEmbeddings(
+            GoogleGenerativeAIEmbeddings(model="models/embedding-001"),
+            path=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        )
+
+        vector_store = SupabaseVectorStore(
+            client=self.supabase,
+            embedding=self.embeddings,
+            table_name=KB_TABLE,
+            query_name=KB_QUERY
+        )
+
+        # Search an in-memory copy of dental_reception_kb instead of calling the
+        # match_dental_docs RPC per question; Supabase is still used if the mirror fails.
+        retriever = vector_store.as_retriever()
+        self.local_index = None
+        if os.getenv("KB_LOCAL_INDEX", "1") == "1":
+            self.local_index = LocalVectorIndex(
+                self.supabase,
+                snapshot_path=os.getenv("KB_SNAPSHOT_PATH"),
+                version_source=lambda: get_kb_version(self.supabase),
+                refresh_interval=float(os.getenv("KB_REFRESH_SECONDS", "60"))
+            )
+            try:
+                self.local_index.refresh()
+            except Exception as e:
+                print(f"Local knowledge base index unavailable, using Supabase: {e}")
+            retriever = LocalKBRetriever(index=self.local_index, embeddings=self.embeddings, fallback=retriever)
+
+        llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.2)
+        self.qa_chain = RetrievalQA.from_chain_type(llm=llm, chain_type="stuff", retriever=retriever)
+
+chat_components = None
+chat_components_lock = threading.Lock()
+
+def get_chat_components():
+    global chat_components
+    if chat_components is None:
+        with chat_components_lock:
+            if chat_components is None:
+                started = time.perf_counter()
+                chat_components = ChatComponents()
+                print(f"Chat backend initialized in {time.perf_counter() - started:.2f}s")
+    return chat_components
+
+def warm_up():
+    try:
+        get_chat_components()
+    except Exception as e:
+        print(f"Warm-up failed, will retry on the first request: {e}")
+
+# --- ANSWER CACHE ---
+# Most traffic is the same few questions ("what are your hours"), so answers are
+# reused by exact question text first, then by embedding similarity. The cache is
+# cleared when backend/ingest.py bumps the knowledge base version.
+answer_cache = AnswerCache(
+    max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "1000")),
+    ttl_seconds=float(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600")),
+    similarity_threshold=float(os.getenv("CHAT_CACHE_SIMILARITY", "0.95")),
+    version_source=lambda: get_kb_version(get_chat_components().supabase),
+    version_check_interval=float(os.getenv("CHAT_CACHE_VERSION_CHECK_SECONDS", "60"))
+)
 
-vector_store = SupabaseVectorStore(
-    client=supabase, 
-    embedding=embeddings, 
-    table_name="dental_reception_kb", 
-    query_name="match_dental_docs"
+# --- CONCURRENCY ---
+# The Supabase and Gemini clients are blocking, so the chain runs on a bounded
+# thread pool instead of the event loop. Past CHAT_MAX_IN_FLIGHT upstream calls
+# new questions get a fast 503, and identical questions asked at the same time
+# share one upstream call.
+chat_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_WORKER_THREADS", "16")),
+    thread_name_prefix="chat"
 )
+chat_limiter = InFlightLimiter(int(os.getenv("CHAT_MAX_IN_FLIGHT", "32")))
+chat_flights = SingleFlight()
+chat_latency = LatencyTracker()
 
-llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.2)
-qa_chain = RetrievalQA.from_chain_type(llm=llm, chain_type="stuff", retriever=vector_store.as_retriever())
+FALLBACK_REPLY = "I apologize, I'm having trouble retrieving that information right now. Please call the office directly."
+OVERLOADED_REPLY = "We're receiving a lot of questions right now. Please try again in a moment or call the office directly."
 
 class ChatRequest(BaseModel):
     message: str
 
+def lookup_cached_answer(message):
+    """Return (cached reply or None, query embedding or None)"""
+    reply = answer_cache.get(message)
+    if reply is not None:
+        return reply, None
+
+    query_embedding = get_chat_components().embeddings.embed_query(message)
+    return answer_cache.get_similar(query_embedding), query_embedding
+
+def answer_question(message):
+    reply, query_embedding = lookup_cached_answer(message)
+    if reply is not None:
+        return reply, True
+
+    response = get_chat_components().qa_chain.invoke(message)
+    reply = response["result"]
+    answer_cache.put(message, query_embedding, reply)
+    return reply, False
+
+async def answer_question_limited(message):
+    chat_limiter.acquire()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(chat_executor, answer_question, message)
+    finally:
+        chat_limiter.release()
+
+def overloaded_response(error):
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(error), "reply": OVERLOADED_REPLY},
+        headers={"Retry-After": "1"}
+    )
+
 @app.post("/chat")
 async def chat(request: ChatRequest):
+    started = time.perf_counter()
     try:
-        response = qa_chain.invoke(request.message)
-        return {"reply": response["result"]}
+        reply, cached = await chat_flights.do(
+            normalize_question(request.message),
+            lambda: answer_question_limited(request.message)
+        )
+        chat_latency.record("chat_total", time.perf_counter() - started)
+        return {"reply": reply, "cached": True} if cached else {"reply": reply}
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         print(f"Error processing request: {e}")
-        return {"error": str(e), "reply": "I apologize, I'm having trouble retrieving that information right now. Please call the office directly."}
+        return {"error": str(e), "reply": FALLBACK_REPLY}
+
+# --- STREAMING ---
+# /chat/stream answers with newline-delimited JSON events so the widget can show
+# text as Gemini generates it:
+#   {"type": "retrieval", "documents": 3}
+#   {"type": "token", "text": "We are open"}
+#   {"type": "done", "reply": "...", "cached": false, "ttfb_ms": 412.0, "total_ms": 1830.5}
+# or {"type": "error", "error": "...", "reply": "..."} if something fails midway.
+def ndjson(event):
+    return json.dumps(event) + "\n"
+
+async def stream_answer(message, started):
+    loop = asyncio.get_running_loop()
+    try:
+        reply, query_embedding = await loop.run_in_executor(chat_executor, lookup_cached_answer, message)
+        cached = reply is not None
+        if cached:
+            ttfb = time.perf_counter() - started
+            yield ndjson({"type": "token", "text": reply})
+        else:
+            ttfb = None
+            parts = []
+            qa_chain = get_chat_components().qa_chain
+            async for event in qa_chain.astream_events(message, version="v2"):
+                if event["event"] == "on_retriever_end":
+                    yield ndjson({"type": "retrieval", "documents": len(event["data"]["output"])})
+                elif event["event"] == "on_chat_model_stream":
+                    text = event["data"]["chunk"].content
+                    if not text:
+                        continue
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - started
+                    parts.append(text)
+                    yield ndjson({"type": "token", "text": text})
+            reply = "".join(parts)
+            answer_cache.put(message, query_embedding, reply)
+
+        total = time.perf_counter() - started
+        if ttfb is not None:
+            chat_latency.record("stream_ttfb", ttfb)
+        chat_latency.record("stream_total", total)
+        yield ndjson({
+            "type": "done",
+            "reply": reply,
+            "cached": cached,
+            "ttfb_ms": round((ttfb or total) * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+        })
+    except Exception as e:
+        print(f"Error streaming response: {e}")
+        yield ndjson({"type": "error", "error": str(e), "reply": FALLBACK_REPLY})
+
+class LimitedStreamingResponse(StreamingResponse):
+    """Streams the body, then releases the chat_limiter permit taken for it
+
+    The permit is released here rather than in the body generator, which
+    never runs if the client goes away before the first chunk is sent.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            chat_limiter.release()
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    started = time.perf_counter()
+    try:
+        chat_limiter.acquire()
+    except Overloaded as e:
+        return overloaded_response(e)
+    return LimitedStreamingResponse(stream_answer(request.message, started), media_type="application/x-ndjson")
+
+@app.get("/chat/cache")
+def chat_cache_stats():
+    return answer_cache.stats()
+
+@app.get("/chat/stats")
+def chat_stats():
+    return {
+        "in_flight": chat_limiter.in_flight,
+        "max_in_flight": chat_limiter.max_in_flight,
+        "rejected": chat_limiter.rejected,
+        "coalesced": chat_flights.coalesced,
+        "latency": chat_latency.summary(),
+        "embedding_cache": chat_components.embeddings.stats() if chat_components else None,
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,158 @@
+"""
+Performance benchmarks for the dental chatbot backend
+Run from the backend directory with: python benchmarks.py
+
+Benchmarks use a fake embedding model, so no Gemini calls are made. Remote
+Supabase measurements run only when SUPABASE_URL and SUPABASE_KEY are set.
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from knowledge_base import KB_TABLE, KB_QUERY
+from local_index import LocalVectorIndex
+
+EMBEDDING_SIZE = 768
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {
+        'p50_ms': statistics.median(samples) * 1000,
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+    }
+
+
+def _build_local_index(document_count):
+    embeddings = DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    texts = [f"Knowledge base entry {i}" for i in range(document_count)]
+    index = LocalVectorIndex(client=None)
+    index.set_documents([Document(page_content=t) for t in texts], embeddings.embed_documents(texts))
+    return index, embeddings
+
+
+def benchmark_local_retrieval(document_count: int = 1_000, query_count: int = 1_000) -> dict:
+    """Top-4 search latency against the in-process index"""
+    index, embeddings = _build_local_index(document_count)
+    queries = [embeddings.embed_query(f"question {i}") for i in range(query_count)]
+
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k=4)
+        samples.append(time.perf_counter() - start)
+
+    return {'document_count': document_count, 'query_count': query_count, **_percentiles(samples)}
+
+
+def benchmark_remote_retrieval(query_count: int = 50) -> dict:
+    """Top-4 search latency through the match_dental_docs RPC"""
+    from supabase.client import create_client
+    from langchain_community.vectorstores import SupabaseVectorStore
+
+    embeddings = DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    vector_store = SupabaseVectorStore(
+        client=client, embedding=embeddings, table_name=KB_TABLE, query_name=KB_QUERY
+    )
+    queries = [embeddings.embed_query(f"question {i}") for i in range(query_count)]
+
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        vector_store.similarity_search_by_vector(query, k=4)
+        samples.append(time.perf_counter() - start)
+
+    return {'query_count': query_count, **_percentiles(samples)}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_healthy(url, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.01)
+    return False
+
+
+def benchmark_cold_start(runs: int = 5, warmup: bool = False, timeout: float = 60) -> dict:
+    """Time from launching the server to the first healthy response, plus `import app`"""
+    env = dict(os.environ, CHAT_WARMUP="1" if warmup else "0")
+
+    import_samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import time; s = time.perf_counter(); import app; print(time.perf_counter() - s)"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        import_samples.append(float(output.strip().splitlines()[-1]))
+
+    healthy_samples = []
+    for _ in range(runs):
+        port = _free_port()
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            if not _wait_healthy(f"http://127.0.0.1:{port}/", timeout):
+                raise RuntimeError(f"server did not become healthy within {timeout}s")
+            healthy_samples.append(time.perf_counter() - start)
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {
+        'runs': runs,
+        'warmup': warmup,
+        'import_seconds': statistics.median(import_samples),
+        'first_healthy_seconds': statistics.median(healthy_samples),
+    }
+
+
+def main():
+    """Run all benchmarks"""
+    load_dotenv()
+
+    for document_count in (10, 1_000, 10_000):
+        result = benchmark_local_retrieval(document_count)
+        print(f"Local index retrieval over {result['document_count']:,} documents")
+        print(f"  p50: {result['p50_ms']:.3f} ms   p99: {result['p99_ms']:.3f} ms")
+
+    if os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"):
+        result = benchmark_remote_retrieval()
+        print(f"Supabase match_dental_docs retrieval ({result['query_count']} queries)")
+        print(f"  p50: {result['p50_ms']:.3f} ms   p99: {result['p99_ms']:.3f} ms")
+    else:
+        print("Supabase retrieval skipped (set SUPABASE_URL and SUPABASE_KEY to compare)")
+
+    for warmup in (False, True):
+        result = benchmark_cold_start(warmup=warmup)
+        print(f"Cold start, warm-up {'on' if warmup else 'off'} (median of {result['runs']} runs)")
+        print(f"  import app:            {result['import_seconds']:.3f} s")
+        print(f"  launch to healthy /:   {result['first_healthy_seconds']:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
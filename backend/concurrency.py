@@ -0,0 +1,63 @@
+"""
+Concurrency controls for the chat endpoints
+
+InFlightLimiter sheds load once too many upstream calls are running, and
+SingleFlight lets identical concurrent requests share one upstream call.
+"""
+
+import asyncio
+
+
+class Overloaded(Exception):
+    """Raised when the in-flight limit is reached"""
+
+
+class InFlightLimiter:
+    """Non-blocking cap on concurrent upstream calls (event loop only)"""
+
+    def __init__(self, max_in_flight):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self):
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise Overloaded(f"{self.in_flight} requests already in flight")
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single call"""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+
+    async def do(self, key, func):
+        """Await func(), or the result of an identical call already running"""
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        # Followers may have all gone away; don't warn about an unread exception
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,99 @@
+"""
+Persistent embedding cache shared by ingest.py and app.py
+
+Wraps a LangChain embeddings object and stores every vector in SQLite as
+float32 bytes, keyed by a hash of the model, the kind of embedding (query or
+document; Gemini embeds them differently) and the text. Repeated questions and
+re-ingests are served from disk without calling the embedding API.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = "embedding_cache.db"
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper backed by a SQLite cache"""
+
+    LOOKUP_BATCH = 500
+
+    def __init__(self, embeddings, path=DEFAULT_CACHE_PATH, namespace=None):
+        self.embeddings = embeddings
+        self.path = path
+        self.namespace = namespace or getattr(embeddings, "model", type(embeddings).__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, "document", self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query", lambda missing: [self.embeddings.embed_query(missing[0])])[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _key(self, kind, text):
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _embed(self, texts, kind, compute):
+        keys = [self._key(kind, text) for text in texts]
+        found = self._lookup(set(keys))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = compute(list(missing.values()))
+            rows = []
+            for key, vector in zip(missing, vectors):
+                blob = np.asarray(vector, dtype=np.float32).tobytes()
+                # Return what a later hit will read back, not the provider's float64s
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                rows.append((key, blob))
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+
+        return [found[key] for key in keys]
+
+    def _lookup(self, keys):
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), self.LOOKUP_BATCH):
+                batch = keys[start:start + self.LOOKUP_BATCH]
+                cursor = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' for _ in batch)})",
+                    batch
+                )
+                for key, blob in cursor:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
@@ -1,31 +1,157 @@
+"""
+Incremental ingestion of the dental knowledge base into Supabase
+
+Reads text/markdown files, splits them into paragraph chunks and keys every
+chunk by a hash of its content. Only chunks that are not already stored are
+embedded (in batches), rows are upserted by hash, and rows whose chunk no
+longer exists are deleted, so re-running on an unchanged corpus is free.
+
+Usage: python ingest.py [PATH ...]   (defaults to kb_docs/)
+"""
+
+import argparse
+import hashlib
 import os
+import uuid
 from dotenv import load_dotenv
 from supabase.client import create_client
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_community.vectorstores import SupabaseVectorStore
 from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from knowledge_base import KB_TABLE, KB_QUERY, bump_kb_version
+from embedding_cache import CachedEmbeddings, DEFAULT_CACHE_PATH
 
 load_dotenv()
 
-# Common SA Dental Knowledge
-dental_data = [
-    "Working Hours: Mon-Fri 08:00 - 17:00. Sat 09:00 - 13:00. Closed on Public Holidays.",
-    "Pricing: Consultation R550. Basic Cleaning R750. Fillings start from R900. Extractions from R800.",
-    "Services: Routine check-ups, teeth whitening, root canals, crowns, and emergency pain management.",
-    "Medical Aids: We accept Discovery, Bonitas, and Momentum. Private patients must settle on the day.",
-    "Location: We are based in Sandton, Johannesburg, near the Gautrain station."
-]
-
-docs = [Document(page_content=x) for x in dental_data]
-
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-
-vector_store = SupabaseVectorStore.from_documents(
-    docs, 
-    embeddings, 
-    client=supabase, 
-    table_name="dental_reception_kb",     # Matches your new SQL table
-    query_name="match_dental_docs"        # Matches your new SQL function
-)
-print("Dental knowledge base updated in Supabase!")
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_docs")
+DOCUMENT_EXTENSIONS = (".md", ".txt")
+CHUNK_NAMESPACE = uuid.UUID("5b0c6f3e-2d1a-4c36-9f5e-8c1d2a7b4e90")
+PAGE_SIZE = 1000
+
+
+def find_files(paths):
+    """Yield (file path, source name relative to the ingested path)"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                        file_path = os.path.join(root, name)
+                        yield file_path, os.path.relpath(file_path, path)
+        else:
+            yield path, os.path.basename(path)
+
+
+def chunk_text(text, splitter, chunk_size):
+    """Split on blank lines, breaking up paragraphs longer than the chunk size"""
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= chunk_size:
+            yield paragraph
+        else:
+            yield from splitter.split_text(paragraph)
+
+
+def load_chunks(paths, chunk_size=1000, chunk_overlap=100):
+    """Return {row id: Document} for every chunk in the given files"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = {}
+    for file_path, source in find_files(paths):
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+        for content in chunk_text(text, splitter, chunk_size):
+            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            row_id = str(uuid.uuid5(CHUNK_NAMESPACE, content_hash))
+            # Identical text in several places is stored once
+            chunks.setdefault(row_id, Document(
+                page_content=content,
+                metadata={"source": source, "content_hash": content_hash}
+            ))
+    return chunks
+
+
+def load_stored_rows(client):
+    """Return {row id: metadata} for every row already in the knowledge base"""
+    rows = {}
+    start = 0
+    while True:
+        result = client.table(KB_TABLE).select("id, metadata").range(start, start + PAGE_SIZE - 1).execute()
+        for row in result.data:
+            rows[str(row["id"])] = row.get("metadata") or {}
+        if len(result.data) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def ingest(paths, client, embeddings, batch_size=100, delete_orphans=True):
+    """Sync the knowledge base with the given files and return what changed"""
+    chunks = load_chunks(paths)
+    stored = load_stored_rows(client)
+
+    new_ids = [row_id for row_id in chunks if row_id not in stored]
+    moved_ids = [row_id for row_id in chunks
+                 if row_id in stored and stored[row_id] != chunks[row_id].metadata]
+    orphan_ids = [row_id for row_id in stored if row_id not in chunks] if delete_orphans else []
+
+    vector_store = SupabaseVectorStore(
+        client=client,
+        embedding=embeddings,
+        table_name=KB_TABLE,     # Matches your new SQL table
+        query_name=KB_QUERY      # Matches your new SQL function
+    )
+    for start in range(0, len(new_ids), batch_size):
+        batch_ids = new_ids[start:start + batch_size]
+        documents = [chunks[row_id] for row_id in batch_ids]
+        vectors = embeddings.embed_documents([d.page_content for d in documents])
+        vector_store.add_vectors(vectors, documents, batch_ids)
+
+    # Text that moved between files keeps its embedding; only the metadata changes
+    for row_id in moved_ids:
+        client.table(KB_TABLE).update({"metadata": chunks[row_id].metadata}).eq("id", row_id).execute()
+
+    for start in range(0, len(orphan_ids), PAGE_SIZE):
+        client.table(KB_TABLE).delete().in_("id", orphan_ids[start:start + PAGE_SIZE]).execute()
+
+    return {
+        "chunks": len(chunks),
+        "added": len(new_ids),
+        "updated": len(moved_ids),
+        "deleted": len(orphan_ids),
+        "unchanged": len(chunks) - len(new_ids) - len(moved_ids),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the dental knowledge base into Supabase")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_SOURCE],
+                        help="files or directories to ingest (default: kb_docs/)")
+    parser.add_argument("--batch-size", type=int, default=100, help="chunks per embedding call")
+    parser.add_argument("--keep-orphans", action="store_true",
+                        help="don't delete rows whose text is no longer in the given paths")
+    args = parser.parse_args()
+
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    embeddings = CachedEmbeddings(
+        GoogleGenerativeAIEmbeddings(model="models/embedding-001"),
+        path=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+    )
+
+    result = ingest(args.paths, supabase, embeddings, args.batch_size, not args.keep_orphans)
+    print(f"{result['chunks']} chunks: {result['added']} added, {result['updated']} updated, "
+          f"{result['deleted']} deleted, {result['unchanged']} unchanged")
+    cache = embeddings.stats()
+    print(f"Embedding cache: {cache['hits']} hits, {cache['misses']} misses")
+
+    if result["added"] or result["updated"] or result["deleted"]:
+        # Tell running chat servers to drop answers cached from the old knowledge base
+        version = bump_kb_version(supabase)
+        print(f"Dental knowledge base updated in Supabase (version {version})!")
+    else:
+        print("Dental knowledge base already up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Shared names and version tracking for the dental_reception_kb knowledge base
+"""
+
+from datetime import datetime, timezone
+
+KB_TABLE = "dental_reception_kb"
+KB_QUERY = "match_dental_docs"
+KB_VERSION_TABLE = "dental_kb_version"
+
+
+def get_kb_version(client):
+    """Return the current knowledge base version, or None if it cannot be read"""
+    try:
+        result = client.table(KB_VERSION_TABLE).select("version").eq("id", 1).limit(1).execute()
+    except Exception as e:
+        print(f"Could not read knowledge base version: {e}")
+        return None
+    return result.data[0]["version"] if result.data else 0
+
+
+def bump_kb_version(client):
+    """Mark the knowledge base as changed so running servers drop stale answers"""
+    version = (get_kb_version(client) or 0) + 1
+    client.table(KB_VERSION_TABLE).upsert({
+        "id": 1,
+        "version": version,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }).execute()
+    return version
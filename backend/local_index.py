@@ -0,0 +1,177 @@
+"""
+In-process mirror of the dental_reception_kb vector table
+
+The knowledge base is small and changes rarely, so it is loaded into a NumPy
+matrix and searched locally instead of calling the match_dental_docs RPC on
+every question. The mirror reloads when the knowledge base version changes,
+can be kept as a memory-mapped snapshot on disk to speed up restarts, and the
+retriever falls back to Supabase whenever the mirror is unavailable.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from knowledge_base import KB_TABLE
+
+
+class LocalVectorIndex:
+    """Cosine-similarity index over the knowledge base rows"""
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, client, table=KB_TABLE, snapshot_path=None, version_source=None,
+                 refresh_interval=60):
+        self.client = client
+        self.table = table
+        self.snapshot_path = snapshot_path
+        self.version_source = version_source
+        self.refresh_interval = refresh_interval
+        self.loads = 0
+        # (unit-length embedding matrix, documents, version), swapped atomically
+        self._state = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._state is not None
+
+    @property
+    def version(self):
+        return self._state[2] if self._state else None
+
+    def __len__(self):
+        return len(self._state[1]) if self._state else 0
+
+    def refresh(self, force=False):
+        """Reload the mirror if the knowledge base version changed"""
+        now = time.monotonic()
+        if not force and self._checked_at is not None and \
+           now - self._checked_at < self.refresh_interval:
+            return
+        # Only one thread reloads; the others keep using the current mirror
+        if not self._lock.acquire(blocking=self._state is None):
+            return
+        try:
+            self._checked_at = now
+            version = self.version_source() if self.version_source else None
+            if self._state is not None and not force and version in (None, self.version):
+                return
+            state = self._load_snapshot(version) if self.snapshot_path else None
+            if state is None:
+                state = self._load_remote(version)
+                if self.snapshot_path:
+                    self._save_snapshot(state)
+            self._state = state
+            self.loads += 1
+            print(f"Local knowledge base index loaded: {len(state[1])} documents (version {version})")
+        finally:
+            self._lock.release()
+
+    def set_documents(self, documents, vectors, version=None):
+        """Replace the mirror with the given documents and embeddings"""
+        self._state = self._build_state(documents, vectors, version)
+
+    def search(self, embedding, k=4):
+        """Return the k most similar documents with their cosine similarity"""
+        matrix, documents, _ = self._state
+        if not documents:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = matrix @ query
+        k = min(k, len(documents))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(documents[i], float(scores[i])) for i in top]
+
+    def _load_remote(self, version):
+        rows = []
+        start = 0
+        while True:
+            result = self.client.table(self.table) \
+                .select("content, metadata, embedding") \
+                .range(start, start + self.PAGE_SIZE - 1) \
+                .execute()
+            rows.extend(result.data)
+            if len(result.data) < self.PAGE_SIZE:
+                break
+            start += self.PAGE_SIZE
+
+        documents = [Document(page_content=row["content"], metadata=row.get("metadata") or {})
+                     for row in rows]
+        # pgvector columns come back from PostgREST as "[0.1,0.2,...]" strings
+        vectors = [json.loads(row["embedding"]) if isinstance(row["embedding"], str) else row["embedding"]
+                   for row in rows]
+        return self._build_state(documents, vectors, version)
+
+    @staticmethod
+    def _build_state(documents, vectors, version):
+        if not documents:
+            return np.zeros((0, 0), dtype=np.float32), [], version
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(documents), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms, list(documents), version
+
+    def _save_snapshot(self, state):
+        matrix, documents, version = state
+        meta = {
+            "version": version,
+            "documents": [{"content": d.page_content, "metadata": d.metadata} for d in documents],
+        }
+        try:
+            # Write to temporary files first so a crash never leaves a torn snapshot
+            with open(self.snapshot_path + ".npy.tmp", "wb") as f:
+                np.save(f, matrix)
+            with open(self.snapshot_path + ".json.tmp", "w") as f:
+                json.dump(meta, f)
+            os.replace(self.snapshot_path + ".npy.tmp", self.snapshot_path + ".npy")
+            os.replace(self.snapshot_path + ".json.tmp", self.snapshot_path + ".json")
+        except OSError as e:
+            print(f"Could not write knowledge base snapshot: {e}")
+
+    def _load_snapshot(self, version):
+        try:
+            with open(self.snapshot_path + ".json") as f:
+                meta = json.load(f)
+            if version is not None and meta["version"] != version:
+                return None
+            matrix = np.load(self.snapshot_path + ".npy", mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(matrix) != len(meta["documents"]):
+            return None
+        documents = [Document(page_content=d["content"], metadata=d["metadata"] or {})
+                     for d in meta["documents"]]
+        return matrix, documents, meta["version"]
+
+
+class LocalKBRetriever(BaseRetriever):
+    """Retriever that searches the local mirror and falls back to Supabase"""
+
+    index: Any
+    embeddings: Any
+    fallback: BaseRetriever
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        try:
+            self.index.refresh()
+            if self.index.ready:
+                embedding = self.embeddings.embed_query(query)
+                return [doc for doc, _ in self.index.search(embedding, self.k)]
+        except Exception as e:
+            print(f"Local knowledge base search failed, using Supabase: {e}")
+        return self.fallback.invoke(query, config={"callbacks": run_manager.get_child()})
@@ -0,0 +1,36 @@
+"""
+Lightweight latency tracking for the chat endpoints
+"""
+
+import threading
+from collections import defaultdict, deque
+
+
+class LatencyTracker:
+    """Keeps the most recent samples per metric and reports percentiles"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._counts[name] += 1
+
+    def summary(self):
+        """Return count and p50/p95/max in milliseconds for every metric"""
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            name: {
+                "count": counts[name],
+                "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+                "max_ms": round(samples[-1] * 1000, 2),
+            }
+            for name, samples in snapshot.items() if samples
+        }
@@ -0,0 +1,58 @@
+"""
+/chat/stream must give back its chat_limiter permit however the stream ends
+Run from the backend directory with: python -m pytest test_chat_stream.py
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def fake_answer(monkeypatch):
+    async def stream_answer(message, started):
+        yield app.ndjson({"type": "token", "text": message})
+        yield app.ndjson({"type": "done", "reply": message})
+
+    monkeypatch.setattr(app, "stream_answer", stream_answer)
+
+
+def test_permit_released_after_stream():
+    client = TestClient(app.app)
+    response = client.post("/chat/stream", json={"message": "hours?"})
+
+    assert response.status_code == 200
+    assert '"done"' in response.text
+    assert app.chat_limiter.in_flight == 0
+
+
+def test_permit_released_when_client_drops_before_first_chunk():
+    async def drop():
+        response = await app.chat_stream(app.ChatRequest(message="hours?"))
+        assert app.chat_limiter.in_flight == 1
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise OSError("client went away")
+
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        # Starlette reports the failed send as ClientDisconnect
+        with pytest.raises(Exception):
+            await response(scope, receive, send)
+
+    asyncio.run(drop())
+    assert app.chat_limiter.in_flight == 0
+
+
+def test_overloaded_stream_gets_503(monkeypatch):
+    monkeypatch.setattr(app.chat_limiter, "max_in_flight", 0)
+    client = TestClient(app.app)
+    response = client.post("/chat/stream", json={"message": "hours?"})
+
+    assert response.status_code == 503
+    assert app.chat_limiter.in_flight == 0
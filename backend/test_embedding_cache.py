@@ -0,0 +1,30 @@
+"""
+CachedEmbeddings must return the same vector for a text on a hit as on a miss
+Run from the backend directory with: python -m pytest test_embedding_cache.py
+"""
+
+from embedding_cache import CachedEmbeddings
+
+
+class FakeEmbeddings:
+    model = "fake-embedding"
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [0.1 * len(text), 1 / 3, 2 ** 0.5]
+
+
+def test_hit_returns_the_vector_the_miss_did(tmp_path):
+    cache = CachedEmbeddings(FakeEmbeddings(), path=str(tmp_path / "embeddings.db"))
+
+    miss = cache.embed_query("What are your opening hours?")
+    hit = cache.embed_query("What are your opening hours?")
+    assert cache.stats()["hits"] == 1
+    assert hit == miss
+
+    miss_docs = cache.embed_documents(["Teeth cleaning", "Root canal"])
+    hit_docs = cache.embed_documents(["Root canal", "Teeth cleaning"])
+    assert hit_docs == miss_docs[::-1]
+    cache.close()
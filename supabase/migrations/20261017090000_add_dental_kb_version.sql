@@ -0,0 +1,17 @@
+-- ============================================================================
+-- DENTAL CHATBOT: KNOWLEDGE BASE VERSION
+-- ============================================================================
+
+-- backend/ingest.py bumps this after rewriting dental_reception_kb so the
+-- chat backend knows to drop cached answers.
+CREATE TABLE IF NOT EXISTS dental_kb_version (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO dental_kb_version (id, version)
+VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
+
+ALTER TABLE dental_kb_version ENABLE ROW LEVEL SECURITY;
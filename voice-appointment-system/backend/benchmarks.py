@@ -0,0 +1,469 @@
+"""
+Performance benchmarks for the voice appointment backend
+Run from the backend directory with: python benchmarks.py
+
+Settings are loaded as usual (.env), but every benchmark runs against an
+in-process PostgREST stand-in, so no Supabase project is touched.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import socket
+import sqlite3
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from config.supabase_client import SupabaseRestClient
+from services import database_service
+from models.schemas import AppointmentResponse
+from services.database_service import DatabaseService
+from utils import metrics
+
+SQL_OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+RESERVED_PARAMS = ("select", "order", "limit", "offset")
+
+
+def _split_terms(expr: str) -> List[str]:
+    """Split a PostgREST logic tree on top-level commas"""
+    terms, depth, quoted, current = [], 0, False, ""
+    for char in expr:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            terms.append(current)
+            current = ""
+            continue
+        current += char
+    return terms + [current]
+
+
+class PostgrestStandIn:
+    """
+    Imitation of the PostgREST endpoints DatabaseService uses, over SQLite
+
+    Supports column filters (eq/neq/gt/gte/lt/lte), and=(...)/or=(...) logic
+    trees, order, limit, offset, Prefer: count=exact|planned|estimated and
+    return=representation. Tables live in an in-memory SQLite database, so
+    counts, deep offsets and index seeks cost roughly what they would in
+    Postgres. ``latency`` is awaited on every request to model the network
+    round trip.
+    """
+
+    def __init__(self, latency: float = 0.02, max_rows: int = 1000):
+        self.latency = latency
+        # Like PostgREST's db-max-rows: estimated counts are exact up to here
+        self.max_rows = max_rows
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.columns: Dict[str, List[str]] = {}
+        # Row counts as of the last bulk load, standing in for planner statistics
+        self.row_estimates: Dict[str, int] = {}
+        self.app = FastAPI()
+        self.app.add_api_route(
+            "/rest/v1/{table}", self.handle,
+            methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]
+        )
+
+    def create_table(self, table: str, columns: List[str]) -> None:
+        """Create a table; a column named id is the primary key"""
+        self.columns[table] = list(columns)
+        definitions = ", ".join(f'"{c}"' + (" PRIMARY KEY" if c == "id" else "") for c in columns)
+        self.db.execute(f'CREATE TABLE "{table}" ({definitions})')
+        self.row_estimates[table] = 0
+
+    def add_rows(self, table: str, rows: List[dict]) -> None:
+        """Insert rows directly, bypassing HTTP"""
+        columns = self.columns[table]
+        self.db.executemany(
+            f'INSERT INTO "{table}" VALUES ({", ".join("?" for _ in columns)})',
+            [tuple(row.get(c) for c in columns) for row in rows]
+        )
+        self.row_estimates[table] = self.db.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+    def create_index(self, table: str, *columns: str) -> None:
+        """Index columns, e.g. create_index("appointments", "created_at", "id")"""
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        self.db.execute(f'CREATE INDEX "idx_{table}_{"_".join(columns)}" ON "{table}" ({quoted})')
+
+    async def handle(self, table: str, request: Request) -> Response:
+        await asyncio.sleep(self.latency)
+        if table not in self.columns:
+            return self._json([], 404)
+        prefer = request.headers.get("prefer", "")
+
+        if request.method == "POST":
+            now = datetime.now().isoformat()
+            row = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **await request.json()}
+            self.add_rows(table, [row])
+            return self._json([row], 201)
+
+        where, params = self._where(table, request.query_params)
+        if request.method == "PATCH":
+            updates = {k: v for k, v in (await request.json()).items() if k in self.columns[table]}
+            assignments = ", ".join(f'"{c}" = ?' for c in updates)
+            self.db.execute(f'UPDATE "{table}" SET {assignments} WHERE {where}', [*updates.values(), *params])
+            return self._json(self._select(table, where, params))
+        if request.method == "DELETE":
+            self.db.execute(f'DELETE FROM "{table}" WHERE {where}', params)
+            return Response(status_code=204)
+
+        query = request.query_params
+        order = []
+        for term in query.get("order", "").split(","):
+            if term:
+                column, _, direction = term.partition(".")
+                self._check_column(table, column)
+                order.append(f'"{column}" {"DESC" if direction.startswith("desc") else "ASC"}')
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", -1))
+        page = [] if request.method == "HEAD" else self._select(
+            table, where, params,
+            f'{"ORDER BY " + ", ".join(order) if order else ""} LIMIT {limit} OFFSET {offset}'
+        )
+
+        total = "*"
+        if "count=" in prefer:
+            method = prefer.split("count=")[1].split(",")[0].strip()
+            total = self._count(table, where, params, method)
+        end = f"{offset}-{offset + len(page) - 1}" if page else "*"
+        headers = {"Content-Range": f"{end}/{total}"}
+        if request.method == "HEAD":
+            return Response(headers=headers)
+        return self._json(page, headers=headers)
+
+    def _select(self, table, where, params, suffix="") -> List[dict]:
+        cursor = self.db.execute(f'SELECT * FROM "{table}" WHERE {where} {suffix}', params)
+        return [dict(row) for row in cursor]
+
+    def _count(self, table, where, params, method) -> int:
+        if method == "planned":
+            return self.row_estimates[table]
+        if method == "estimated":
+            # Count at most max_rows + 1 rows; past that, fall back to statistics
+            bounded = self.db.execute(
+                f'SELECT COUNT(*) FROM (SELECT 1 FROM "{table}" WHERE {where} LIMIT ?)',
+                [*params, self.max_rows + 1]
+            ).fetchone()[0]
+            return bounded if bounded <= self.max_rows else self.row_estimates[table]
+        return self.db.execute(f'SELECT COUNT(*) FROM "{table}" WHERE {where}', params).fetchone()[0]
+
+    def _where(self, table, query) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in query.multi_items():
+            if column in RESERVED_PARAMS:
+                continue
+            if column in ("and", "or"):
+                clauses.append(self._logic(table, value[1:-1], column.upper(), params))
+            else:
+                clauses.append(self._condition(table, column, value, params))
+        return " AND ".join(clauses) or "1", params
+
+    def _logic(self, table, expr, joiner, params) -> str:
+        clauses = []
+        for term in _split_terms(expr):
+            if term.startswith(("and(", "or(")):
+                name, _, inner = term.partition("(")
+                clauses.append(self._logic(table, inner[:-1], name.upper(), params))
+            else:
+                column, _, value = term.partition(".")
+                clauses.append(self._condition(table, column, value, params))
+        return "(" + f" {joiner} ".join(clauses) + ")"
+
+    def _condition(self, table, column, value, params) -> str:
+        self._check_column(table, column)
+        op, _, operand = value.partition(".")
+        params.append(operand[1:-1] if operand.startswith('"') else operand)
+        return f'"{column}" {SQL_OPERATORS[op]} ?'
+
+    def _check_column(self, table, column) -> None:
+        if column not in self.columns[table]:
+            raise ValueError(f"Unknown column: {column}")
+
+    @staticmethod
+    def _json(rows, status_code=200, headers=None) -> Response:
+        return Response(json.dumps(rows), status_code=status_code,
+                        media_type="application/json", headers=headers)
+
+
+def _serve_stand_in(stand_in: PostgrestStandIn, port: int) -> None:
+    uvicorn.run(stand_in.app, port=port, log_level="warning", backlog=4096)
+
+
+class _StandInServer:
+    """Serve a stand-in on a free local port from a separate process"""
+
+    def __init__(self, stand_in: PostgrestStandIn):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        # A separate process, like a real PostgREST, so the server doesn't
+        # compete with the client under test for the GIL
+        self.process = multiprocessing.get_context("fork").Process(
+            target=_serve_stand_in, args=(stand_in, self.port), daemon=True
+        )
+
+    def __enter__(self):
+        self.process.start()
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+
+def _appointments_stand_in(latency: float, row_count: int) -> PostgrestStandIn:
+    """Stand-in holding row_count appointments created one second apart"""
+    stand_in = PostgrestStandIn(latency)
+    table = DatabaseService.TABLE_NAME
+    stand_in.create_table(table, list(AppointmentResponse.model_fields))
+    # Same listing index as setup-database.sql
+    stand_in.create_index(table, "created_at", "id")
+
+    created = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    for start in range(0, row_count, 100_000):
+        rows = []
+        for i in range(start, min(start + 100_000, row_count)):
+            timestamp = (created + timedelta(seconds=i)).isoformat()
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "customer_name": f"Caller {i}",
+                "customer_email": f"caller{i}@example.com",
+                "customer_phone": "0123456789",
+                "appointment_date": "2030-01-07",
+                "appointment_time": f"{8 + i % 10:02d}:00",
+                "service_type": "cleaning",
+                "status": "scheduled",
+                "google_calendar_event_id": None,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+            })
+        stand_in.add_rows(table, rows)
+    return stand_in
+
+
+async def _run_callers(callers: int, requests_per_caller: int, ids: List[str], call) -> dict:
+    samples = []
+
+    async def caller(n):
+        for i in range(requests_per_caller):
+            start = time.perf_counter()
+            await call(ids[(n + i) % len(ids)])
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(n) for n in range(callers)))
+    elapsed = time.perf_counter() - start
+    samples.sort()
+    return {
+        'requests_per_second': len(samples) / elapsed,
+        'p50_ms': statistics.median(samples) * 1000,
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+    }
+
+
+async def benchmark_concurrent_lookups(
+    callers: int = 200,
+    requests_per_caller: int = 5,
+    latency: float = 0.02,
+    pool_size: int = 20
+) -> dict:
+    """
+    get_appointment throughput with many concurrent callers
+
+    Compares the previous blocking supabase-py query issued from an async
+    handler with DatabaseService on the pooled async client.
+    """
+    from supabase import create_client
+
+    stand_in = _appointments_stand_in(latency, 1_000)
+    ids = [row[0] for row in stand_in.db.execute("SELECT id FROM appointments")]
+    with _StandInServer(stand_in) as server:
+        blocking_client = create_client(server.url, "benchmark-key")
+
+        async def blocking_lookup(appointment_id):
+            blocking_client.table(DatabaseService.TABLE_NAME).select("*").eq(
+                "id", appointment_id
+            ).execute()
+
+        blocking = await _run_callers(callers, requests_per_caller, ids, blocking_lookup)
+
+        original = database_service.supabase
+        database_service.supabase = SupabaseRestClient(server.url, "benchmark-key", pool_size=pool_size)
+        try:
+            pooled = await _run_callers(callers, requests_per_caller, ids, DatabaseService.get_appointment)
+        finally:
+            await database_service.supabase.aclose()
+            database_service.supabase = original
+
+    return {
+        'callers': callers,
+        'requests': callers * requests_per_caller,
+        'latency_ms': latency * 1000,
+        'pool_size': pool_size,
+        'blocking': blocking,
+        'pooled': pooled,
+    }
+
+
+async def _two_request_page(offset: int, limit: int) -> None:
+    """The previous list_appointments: a range query, then a full-table count"""
+    await database_service.supabase.select(DatabaseService.TABLE_NAME, {
+        "order": "created_at.desc", "limit": str(limit), "offset": str(offset)
+    })
+    await database_service.supabase.request(
+        "HEAD", DatabaseService.TABLE_NAME,
+        params={"select": "id"}, headers={"Prefer": "count=exact"}
+    )
+
+
+async def benchmark_list_pages(
+    row_count: int = 1_000_000,
+    page_size: int = 50,
+    depths: tuple = (0, 100, 10_000),
+    samples: int = 20,
+    latency: float = 0.001
+) -> dict:
+    """
+    list_appointments page latency over a large table
+
+    For each page depth (in pages), compares the previous two-request
+    offset listing with single-request offset and keyset listings, the
+    latter with exact and estimated counts.
+    """
+    stand_in = _appointments_stand_in(latency, row_count)
+    # Keyset cursors for the last row before each measured page
+    cursors = {}
+    for depth in depths:
+        if depth:
+            row = stand_in.db.execute(
+                "SELECT * FROM appointments ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?",
+                [depth * page_size - 1]
+            ).fetchone()
+            cursors[depth] = DatabaseService.page_cursor(AppointmentResponse(**dict(row)))
+        else:
+            cursors[depth] = None
+
+    results = {}
+    with _StandInServer(stand_in) as server:
+        original = database_service.supabase
+        database_service.supabase = SupabaseRestClient(server.url, "benchmark-key", timeout_seconds=60)
+        try:
+            for depth in depths:
+                offset = depth * page_size
+                variants = {
+                    'two_requests': lambda: _two_request_page(offset, page_size),
+                    'offset_exact': lambda: DatabaseService.list_appointments(page_size, offset),
+                    'keyset_exact': lambda: DatabaseService.list_appointments(
+                        page_size, cursor=cursors[depth]),
+                    'keyset_estimated': lambda: DatabaseService.list_appointments(
+                        page_size, cursor=cursors[depth], count="estimated"),
+                }
+                results[depth] = {}
+                for name, call in variants.items():
+                    timings = []
+                    for _ in range(samples):
+                        start = time.perf_counter()
+                        await call()
+                        timings.append(time.perf_counter() - start)
+                    results[depth][name] = statistics.median(timings) * 1000
+        finally:
+            await database_service.supabase.aclose()
+            database_service.supabase = original
+
+    return {'row_count': row_count, 'page_size': page_size, 'pages': results}
+
+
+async def benchmark_metrics_overhead(calls: int = 100_000, requests: int = 2_000) -> dict:
+    """
+    Cost of the metrics on the hot path
+
+    Compares a no-op async service call with and without timed_call, and
+    the work the request middleware adds with an in-process GET /health
+    through the full app.
+    """
+    import httpx
+    from main import app
+
+    async def noop():
+        return None
+
+    instrumented = metrics.timed_call("benchmark")(noop)
+    per_call = {}
+    for name, call in (('plain', noop), ('instrumented', instrumented)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            await call()
+        per_call[name] = (time.perf_counter() - start) / calls * 1e9
+
+    # The bookkeeping log_requests does for every request
+    start = time.perf_counter()
+    for _ in range(calls):
+        metrics.http_requests_in_flight.inc()
+        started = time.perf_counter()
+        elapsed = time.perf_counter() - started
+        metrics.http_requests_in_flight.dec()
+        metrics.http_request_duration_seconds.observe(elapsed, "GET", "/benchmark")
+        metrics.http_requests_total.inc("GET", "/benchmark", "200")
+    request_metrics_ns = (time.perf_counter() - start) / calls * 1e9
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/health")
+        request_ns = (time.perf_counter() - start) / requests * 1e9
+
+    return {
+        'service_call_ns': per_call,
+        'request_metrics_ns': request_metrics_ns,
+        'request_ns': request_ns,
+    }
+
+
+async def main():
+    """Run all benchmarks"""
+    result = await benchmark_concurrent_lookups()
+    print(f"get_appointment with {result['callers']} concurrent callers "
+          f"({result['requests']:,} requests, {result['latency_ms']:.0f} ms simulated round trip)")
+    for name in ('blocking', 'pooled'):
+        stats = result[name]
+        print(f"  {name + ':':<10} {stats['requests_per_second']:,.0f} req/s   "
+              f"p50 {stats['p50_ms']:.1f} ms   p99 {stats['p99_ms']:.1f} ms")
+
+    result = await benchmark_list_pages()
+    print(f"list_appointments page latency over {result['row_count']:,} rows "
+          f"(median ms, {result['page_size']} rows per page)")
+    print(f"  {'page':>8} {'two requests':>14} {'offset':>10} {'keyset':>10} {'keyset+est':>12}")
+    for depth, timings in result['pages'].items():
+        print(f"  {depth:>8,} {timings['two_requests']:>14.1f} {timings['offset_exact']:>10.1f} "
+              f"{timings['keyset_exact']:>10.1f} {timings['keyset_estimated']:>12.1f}")
+
+    result = await benchmark_metrics_overhead()
+    calls = result['service_call_ns']
+    print("Metrics overhead on the hot path")
+    print(f"  service call: {calls['plain']:,.0f} ns plain, {calls['instrumented']:,.0f} ns "
+          f"with timed_call (+{calls['instrumented'] - calls['plain']:,.0f} ns)")
+    print(f"  request:      {result['request_metrics_ns']:,.0f} ns of metrics per request, "
+          f"{result['request_metrics_ns'] / result['request_ns']:.2%} of an in-process "
+          f"GET /health ({result['request_ns'] / 1000:,.0f} us)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
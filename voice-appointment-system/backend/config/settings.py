@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_anon_key: str
     supabase_service_key: str
+    database_timeout_seconds: float = 5.0
+    database_pool_size: int = 20
     
     # Google Calendar
     google_calendar_id: str
@@ -23,6 +25,9 @@ class Settings(BaseSettings):
     emailjs_service_id: str
     emailjs_template_id: str
     emailjs_public_key: str
+    email_outbox_path: str = "email_outbox.db"
+    email_max_attempts: int = 8
+    email_worker_concurrency: int = 4
     
     # ElevenLabs
     elevenlabs_agent_id: str
@@ -37,6 +42,14 @@ class Settings(BaseSettings):
     business_end_hour: int = 18
     business_days: str = "Monday,Tuesday,Wednesday,Thursday,Friday"
     appointment_duration_minutes: int = 30
+    slot_interval_minutes: int = 30
+    find_slots_max_days: int = 31
+    find_slots_budget_ms: int = 1000
+    # Without a Redis URL each worker caches separately and only sees its own
+    # writes; with WEB_CONCURRENCY > 1 set one, or keep the TTL short
+    availability_cache_ttl_seconds: int = 60
+    availability_cache_redis_url: str = ""
+    availability_cache_max_dates: int = 1024
     
     class Config:
         env_file = ".env"
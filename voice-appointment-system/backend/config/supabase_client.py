@@ -0,0 +1,143 @@
+"""
+Supabase Client Configuration
+Async PostgREST client with a pooled, keep-alive HTTP connection
+"""
+
+import asyncio
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import aiohttp
+
+from config.settings import settings
+
+
+class SupabaseRestClient:
+    """
+    Minimal async client for the Supabase REST (PostgREST) API
+
+    Requests share one aiohttp session, so connections to Supabase are kept
+    alive and reused instead of being opened per query, and at most
+    ``pool_size`` requests are in flight at once. Every call has a timeout,
+    which can be overridden per call.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        timeout_seconds: float = 5.0,
+        pool_size: int = 20
+    ):
+        self.base_url = f"{url.rstrip('/')}/rest/v1/"
+        self.headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+        self.timeout_seconds = timeout_seconds
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """HTTP session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        # Pooled connections belong to the loop that opened them
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30),
+                raise_for_status=True
+            )
+            self._loop = loop
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        table: str,
+        params: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[Any, Mapping[str, str]]:
+        """
+        Send a request to a table endpoint
+
+        Args:
+            method: HTTP method
+            table: Table name
+            params: PostgREST query parameters, e.g. {"id": "eq.123"}
+            json: Request body
+            headers: Extra headers, e.g. Prefer
+            timeout: Seconds before giving up; defaults to timeout_seconds
+
+        Returns:
+            Decoded JSON body (None if empty) and response headers;
+            raises aiohttp.ClientError or asyncio.TimeoutError on failure
+        """
+        async with self.session.request(
+            method,
+            self.base_url + table,
+            params=params,
+            json=json,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(
+                total=timeout if timeout is not None else self.timeout_seconds
+            )
+        ) as response:
+            body = await response.read()
+            return (await response.json() if body else None), response.headers
+
+    async def select(
+        self,
+        table: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> List[dict]:
+        """Return the rows matching the query parameters"""
+        rows, _ = await self.request("GET", table, params=params, timeout=timeout)
+        return rows
+
+    async def insert(self, table: str, data: dict, timeout: Optional[float] = None) -> List[dict]:
+        """Insert a row and return it"""
+        rows, _ = await self.request(
+            "POST", table, json=data,
+            headers={"Prefer": "return=representation"}, timeout=timeout
+        )
+        return rows
+
+    async def update(
+        self,
+        table: str,
+        params: Dict[str, str],
+        data: dict,
+        timeout: Optional[float] = None
+    ) -> List[dict]:
+        """Update the matching rows and return them"""
+        rows, _ = await self.request(
+            "PATCH", table, params=params, json=data,
+            headers={"Prefer": "return=representation"}, timeout=timeout
+        )
+        return rows
+
+    async def delete(
+        self,
+        table: str,
+        params: Dict[str, str],
+        timeout: Optional[float] = None
+    ) -> None:
+        """Delete the matching rows"""
+        await self.request("DELETE", table, params=params, timeout=timeout)
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# The backend uses the service key so it can manage appointments on behalf of callers
+supabase = SupabaseRestClient(
+    settings.supabase_url,
+    settings.supabase_service_key,
+    timeout_seconds=settings.database_timeout_seconds,
+    pool_size=settings.database_pool_size
+)
@@ -5,21 +5,43 @@ Voice Appointment Booking System with ElevenLabs AI Integration
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 import os
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 from config.settings import settings
+from config.supabase_client import supabase
 from routers import tools, webhooks
 from models.schemas import HealthCheckResponse
+from services.availability_cache import occupancy_cache
+from services.email_service import email_outbox
 from utils.logger import app_logger
+from utils.metrics import (
+    CONTENT_TYPE, ErrorCounter, registry, http_request_duration_seconds,
+    http_requests_in_flight, http_requests_total, log_errors_total
+)
+
+app_logger.addHandler(ErrorCounter(log_errors_total))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the email outbox worker; close pooled connections on shutdown"""
+    email_outbox.start()
+    yield
+    await email_outbox.stop()
+    await supabase.aclose()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Voice Appointment System",
     description="AI-powered appointment booking with ElevenLabs",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -35,11 +57,15 @@ app.add_middleware(
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all incoming requests"""
+    """Log all incoming requests and record their duration and status"""
     app_logger.info(f"{request.method} {request.url.path}")
     
+    http_requests_in_flight.inc()
+    started = time.perf_counter()
+    status_code = 500
     try:
         response = await call_next(request)
+        status_code = response.status_code
         return response
     except Exception as e:
         app_logger.error(f"Request error: {str(e)}")
@@ -47,6 +73,14 @@ async def log_requests(request: Request, call_next):
             status_code=500,
             content={"detail": "Internal server error"}
         )
+    finally:
+        elapsed = time.perf_counter() - started
+        http_requests_in_flight.dec()
+        # Label by route template so IDs and unknown paths don't create new series
+        route = request.scope.get("route")
+        path = (getattr(route, "path", None) or "/") if route is not None else "unmatched"
+        http_request_duration_seconds.observe(elapsed, request.method, path)
+        http_requests_total.inc(request.method, path, str(status_code))
 
 
 # Global exception handler
@@ -76,8 +110,10 @@ async def root():
         "status": "running",
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "tools": {
                 "check_availability": "POST /tools/check-availability",
+                "find_slots": "POST /tools/find-slots",
                 "book_appointment": "POST /tools/book-appointment",
                 "cancel_appointment": "POST /tools/cancel-appointment",
                 "reschedule_appointment": "POST /tools/reschedule-appointment"
@@ -99,6 +135,24 @@ async def health_check():
     )
 
 
+@app.get("/health/availability-cache")
+async def availability_cache_stats():
+    """Availability cache hit/miss statistics"""
+    return occupancy_cache.stats()
+
+
+@app.get("/health/email-outbox")
+async def email_outbox_stats():
+    """Email outbox queue depth and delivery counters"""
+    return await email_outbox.stats()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Request and service call metrics in the Prometheus text format"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 # Mount frontend static files if they exist
 frontend_path = os.path.join(os.path.dirname(__file__), "../frontend")
 if os.path.exists(frontend_path):
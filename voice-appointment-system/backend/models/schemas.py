@@ -3,7 +3,7 @@ Pydantic Data Models and Validation Schemas
 """
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -48,6 +48,17 @@ class BookAppointmentRequest(BaseModel):
     service_type: str = Field(..., min_length=1, max_length=100)
 
 
+class FindSlotsRequest(BaseModel):
+    """Find free slots request"""
+    start_date: str = Field(..., description="First date to search in YYYY-MM-DD format")
+    end_date: Optional[str] = Field(None, description="Last date to search in YYYY-MM-DD format (defaults to two weeks)")
+    service_type: Optional[str] = Field(None, max_length=100)
+    preferred_days: Optional[List[str]] = Field(None, description="Day names, e.g. ['Monday', 'Friday']")
+    earliest_time: Optional[str] = Field(None, description="Earliest start time in HH:MM format")
+    latest_time: Optional[str] = Field(None, description="Latest start time in HH:MM format")
+    max_results: int = Field(3, ge=1, le=20)
+
+
 class CancelAppointmentRequest(BaseModel):
     """Cancel appointment request"""
     appointment_id: str = Field(..., min_length=1)
@@ -71,6 +82,7 @@ class ListAppointmentsResponse(BaseModel):
     """List appointments response"""
     total: int
     appointments: list[AppointmentResponse]
+    next_cursor: Optional[str] = None
 
 
 class HealthCheckResponse(BaseModel):
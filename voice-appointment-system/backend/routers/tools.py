@@ -1,11 +1,15 @@
 """
 ElevenLabs Tools Router
-Provides 4 endpoints for voice assistant appointment booking
+Provides 5 endpoints for voice assistant appointment booking
 """
 
+import asyncio
+import time
+from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, status
+from config.settings import settings
 from models.schemas import (
-    CheckAvailabilityRequest, BookAppointmentRequest,
+    CheckAvailabilityRequest, BookAppointmentRequest, FindSlotsRequest,
     CancelAppointmentRequest, RescheduleAppointmentRequest,
     ElevenLabsToolResponse, AppointmentCreate
 )
@@ -13,6 +17,7 @@ from services.calendar_service import CalendarService
 from services.database_service import DatabaseService
 from services.email_service import EmailService
 from utils.logger import app_logger
+from utils.metrics import timed_step
 
 router = APIRouter(prefix="/tools", tags=["appointment_tools"])
 
@@ -34,7 +39,10 @@ async def check_availability(request: CheckAvailabilityRequest) -> ElevenLabsToo
         return ElevenLabsToolResponse(
             success=availability.get("available", False),
             message=availability.get("message") or availability.get("reason", "Unknown error"),
-            data={"available": availability.get("available", False)}
+            data={
+                "available": availability.get("available", False),
+                "alternatives": availability.get("alternatives", [])
+            }
         )
     except Exception as e:
         app_logger.error(f"Error checking availability: {str(e)}")
@@ -45,20 +53,86 @@ async def check_availability(request: CheckAvailabilityRequest) -> ElevenLabsToo
         )
 
 
+@router.post("/find-slots", response_model=ElevenLabsToolResponse)
+async def find_slots(request: FindSlotsRequest) -> ElevenLabsToolResponse:
+    """
+    Find the earliest free slots across a date range in one call
+    ElevenLabs Tool: Find Slots
+    """
+    started = time.perf_counter()
+    try:
+        end_date = request.end_date or (
+            datetime.strptime(request.start_date, "%Y-%m-%d") + timedelta(days=13)
+        ).strftime("%Y-%m-%d")
+        app_logger.info(f"Finding slots from {request.start_date} to {end_date}")
+        
+        # The caller is waiting on the phone, so give up rather than stall
+        slots = await asyncio.wait_for(
+            CalendarService.find_slots(
+                request.start_date,
+                end_date,
+                preferred_days=request.preferred_days,
+                earliest_time=request.earliest_time,
+                latest_time=request.latest_time,
+                count=request.max_results
+            ),
+            timeout=settings.find_slots_budget_ms / 1000
+        )
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        
+        if not slots:
+            return ElevenLabsToolResponse(
+                success=False,
+                message=f"There are no open slots between {request.start_date} and {end_date} that match those preferences.",
+                data={"slots": [], "elapsed_ms": elapsed_ms}
+            )
+        
+        options = ", ".join(f"{slot['day']} {slot['date']} at {slot['time']}" for slot in slots)
+        return ElevenLabsToolResponse(
+            success=True,
+            message=f"The earliest available times are {options}.",
+            data={
+                "slots": slots,
+                "service_type": request.service_type,
+                "elapsed_ms": elapsed_ms
+            }
+        )
+    except asyncio.TimeoutError:
+        app_logger.error(f"Finding slots exceeded {settings.find_slots_budget_ms}ms budget")
+        return ElevenLabsToolResponse(
+            success=False,
+            message="I'm having trouble looking up the calendar right now. Could you suggest a specific day and time?",
+            data={}
+        )
+    except ValueError:
+        return ElevenLabsToolResponse(
+            success=False,
+            message="Invalid date or time format",
+            data={}
+        )
+    except Exception as e:
+        app_logger.error(f"Error finding slots: {str(e)}")
+        return ElevenLabsToolResponse(
+            success=False,
+            message="Error finding available slots. Please try again.",
+            data={}
+        )
+
+
 @router.post("/book-appointment", response_model=ElevenLabsToolResponse)
 async def book_appointment(request: BookAppointmentRequest) -> ElevenLabsToolResponse:
     """
     Book a new appointment
     ElevenLabs Tool: Book Appointment
-    Flow: Check availability → Create calendar event → Save to DB → Send email
+    Flow: Check availability → Create calendar event ∥ Save to DB → Send email
     """
     try:
         app_logger.info(f"Booking appointment for {request.customer_name}")
         
-        # 1. Check availability
-        availability = await CalendarService.check_availability(
-            request.date,
-            request.time
+        # 1. Check availability against the database; cached days are only a hint
+        availability = await timed_step(
+            "book", "check_availability",
+            CalendarService.check_availability(request.date, request.time, fresh=True)
         )
         
         if not availability.get("available"):
@@ -68,16 +142,9 @@ async def book_appointment(request: BookAppointmentRequest) -> ElevenLabsToolRes
                 data={}
             )
         
-        # 2. Create calendar event
-        google_event_id = await CalendarService.create_event(
-            request.customer_name,
-            request.customer_email,
-            request.date,
-            request.time,
-            request.service_type
-        )
-        
-        # 3. Save to database
+        # 2. Create calendar event and save to database concurrently; the
+        # event ID is chosen up front so the row can reference it
+        event_id = CalendarService.new_event_id()
         appointment_data = AppointmentCreate(
             customer_name=request.customer_name,
             customer_email=request.customer_email,
@@ -87,26 +154,46 @@ async def book_appointment(request: BookAppointmentRequest) -> ElevenLabsToolRes
             service_type=request.service_type
         )
         
-        appointment = await DatabaseService.create_appointment(
-            appointment_data,
-            google_event_id
+        google_event_id, appointment = await asyncio.gather(
+            timed_step("book", "create_event", CalendarService.create_event(
+                request.customer_name,
+                request.customer_email,
+                request.date,
+                request.time,
+                request.service_type,
+                event_id=event_id
+            )),
+            timed_step("book", "save", DatabaseService.create_appointment(
+                appointment_data,
+                event_id
+            ))
         )
         
         if not appointment:
+            # Roll back the calendar event so it doesn't hold the slot
+            if google_event_id:
+                await CalendarService.delete_event(google_event_id)
             return ElevenLabsToolResponse(
                 success=False,
                 message="Failed to save appointment. Please try again.",
                 data={}
             )
         
-        # 4. Send confirmation email
-        await EmailService.send_booking_confirmation(
+        if not google_event_id:
+            # Keep the booking, but don't point it at an event that doesn't exist
+            await DatabaseService.update_appointment(
+                appointment.id,
+                {"google_calendar_event_id": None}
+            )
+        
+        # 3. Send confirmation email
+        await timed_step("book", "send_email", EmailService.send_booking_confirmation(
             request.customer_name,
             request.customer_email,
             request.date,
             request.time,
             request.service_type
-        )
+        ))
         
         return ElevenLabsToolResponse(
             success=True,
@@ -190,15 +277,26 @@ async def reschedule_appointment(request: RescheduleAppointmentRequest) -> Eleve
     """
     Reschedule an existing appointment
     ElevenLabs Tool: Reschedule Appointment
-    Flow: Check new availability → Update calendar → Update DB → Send email
+    Flow: Check new availability ∥ Get appointment → Update calendar ∥ Update DB → Send email
     """
     try:
         app_logger.info(f"Rescheduling appointment: {request.appointment_id}")
         
-        # 1. Check new availability
-        availability = await CalendarService.check_availability(
-            request.new_date,
-            request.new_time
+        # 1. Check new availability and get appointment details
+        availability, appointment = await asyncio.gather(
+            timed_step(
+                "reschedule", "check_availability",
+                CalendarService.check_availability(
+                    request.new_date,
+                    request.new_time,
+                    exclude_id=request.appointment_id,
+                    fresh=True
+                )
+            ),
+            timed_step(
+                "reschedule", "get_appointment",
+                DatabaseService.get_appointment(request.appointment_id)
+            )
         )
         
         if not availability.get("available"):
@@ -208,9 +306,6 @@ async def reschedule_appointment(request: RescheduleAppointmentRequest) -> Eleve
                 data={}
             )
         
-        # 2. Get appointment details
-        appointment = await DatabaseService.get_appointment(request.appointment_id)
-        
         if not appointment:
             return ElevenLabsToolResponse(
                 success=False,
@@ -218,33 +313,39 @@ async def reschedule_appointment(request: RescheduleAppointmentRequest) -> Eleve
                 data={}
             )
         
-        # 3. Update calendar event
-        if appointment.google_calendar_event_id:
-            await CalendarService.update_event(
-                appointment.google_calendar_event_id,
-                request.new_date,
-                request.new_time
-            )
-        
-        # 4. Update database
-        updated = await DatabaseService.update_appointment(
+        # 2. Update database and calendar event concurrently
+        steps = [timed_step("reschedule", "save", DatabaseService.update_appointment(
             request.appointment_id,
             {
                 "appointment_date": request.new_date,
                 "appointment_time": request.new_time,
                 "status": "scheduled"
             }
-        )
+        ))]
+        if appointment.google_calendar_event_id:
+            steps.append(timed_step("reschedule", "update_event", CalendarService.update_event(
+                appointment.google_calendar_event_id,
+                request.new_date,
+                request.new_time
+            )))
+        updated, *calendar_updated = await asyncio.gather(*steps)
         
         if not updated:
+            # Move the calendar event back to where the booking still is
+            if any(calendar_updated):
+                await CalendarService.update_event(
+                    appointment.google_calendar_event_id,
+                    appointment.appointment_date,
+                    appointment.appointment_time[:5]
+                )
             return ElevenLabsToolResponse(
                 success=False,
                 message="Failed to reschedule appointment.",
                 data={}
             )
         
-        # 5. Send reschedule email
-        await EmailService.send_reschedule_email(
+        # 3. Send reschedule email
+        await timed_step("reschedule", "send_email", EmailService.send_reschedule_email(
             appointment.customer_name,
             appointment.customer_email,
             appointment.appointment_date,
@@ -252,7 +353,7 @@ async def reschedule_appointment(request: RescheduleAppointmentRequest) -> Eleve
             request.new_date,
             request.new_time,
             appointment.service_type
-        )
+        ))
         
         return ElevenLabsToolResponse(
             success=True,
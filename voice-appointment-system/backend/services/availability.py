@@ -0,0 +1,191 @@
+"""
+Availability Index
+Interval index over a day's booked appointments for conflict checks and free-slot search
+"""
+
+from bisect import bisect_right
+from math import gcd
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from models.schemas import AppointmentResponse
+
+
+def parse_minutes(time_str: str) -> int:
+    """Convert HH:MM (or HH:MM:SS as returned by Postgres) to minutes since midnight"""
+    hours, minutes = time_str.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int) -> str:
+    """Convert minutes since midnight to HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class DayAvailability:
+    """
+    Busy time for a single day as sorted, non-overlapping intervals
+
+    Intervals are half-open [start, end) in minutes since midnight. Overlapping
+    bookings are merged on load, so conflict checks are a binary search.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    @classmethod
+    def from_appointments(
+        cls,
+        appointments: Iterable[AppointmentResponse],
+        duration_minutes: int
+    ) -> "DayAvailability":
+        """Build the index from a day's scheduled appointments"""
+        intervals = []
+        for appointment in appointments:
+            start = parse_minutes(appointment.appointment_time)
+            intervals.append((start, start + duration_minutes))
+        return cls(intervals)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def conflict(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Return the busy interval overlapping [start, end), if any"""
+        i = bisect_right(self.starts, start) - 1
+        if i >= 0 and self.ends[i] > start:
+            return self.starts[i], self.ends[i]
+        if i + 1 < len(self.starts) and self.starts[i + 1] < end:
+            return self.starts[i + 1], self.ends[i + 1]
+        return None
+
+    def is_free(self, start: int, end: int) -> bool:
+        """Check whether [start, end) is free"""
+        return self.conflict(start, end) is None
+
+    def free_slots(
+        self,
+        open_minute: int,
+        close_minute: int,
+        duration_minutes: int,
+        step_minutes: int,
+        after: int = 0
+    ) -> Iterator[int]:
+        """
+        Yield start times of free slots on the opening-hours grid
+
+        Args:
+            open_minute: Opening time; slots are aligned to it
+            close_minute: Closing time; slots must end by then
+            duration_minutes: Length of the slot
+            step_minutes: Spacing of the slot grid
+            after: Earliest allowed start time
+
+        Yields:
+            Slot start times in minutes since midnight, in order
+        """
+        start = open_minute
+        if after > start:
+            start += -(-(after - start) // step_minutes) * step_minutes
+
+        i = max(bisect_right(self.starts, start) - 1, 0)
+        while start + duration_minutes <= close_minute:
+            # Skip busy intervals that end before this slot
+            while i < len(self.starts) and self.ends[i] <= start:
+                i += 1
+            if i < len(self.starts) and self.starts[i] < start + duration_minutes:
+                # Jump to the first grid point after the blocking interval
+                start += -(-(self.ends[i] - start) // step_minutes) * step_minutes
+                continue
+            yield start
+            start += step_minutes
+
+
+class SlotBitmap:
+    """
+    Occupancy of one day's opening hours as an integer bitmap
+
+    Bit i covers [open + i * unit, open + (i + 1) * unit). Free slots for a
+    whole day are found with a handful of shifts and ANDs over the bitmap
+    instead of testing each candidate time separately.
+    """
+
+    def __init__(self, open_minute: int, close_minute: int, unit_minutes: int):
+        self.open_minute = open_minute
+        self.unit = unit_minutes
+        self.width = max((close_minute - open_minute) // unit_minutes, 0)
+        self.full = (1 << self.width) - 1
+        self.bits = 0
+
+    @classmethod
+    def for_grid(
+        cls,
+        open_minute: int,
+        close_minute: int,
+        duration_minutes: int,
+        step_minutes: int
+    ) -> "SlotBitmap":
+        """Create a bitmap whose resolution fits both the slot length and spacing"""
+        return cls(open_minute, close_minute, gcd(duration_minutes, step_minutes))
+
+    def mark(self, start: int, end: int) -> None:
+        """Mark [start, end) busy, rounding outwards to whole units"""
+        first = max((start - self.open_minute) // self.unit, 0)
+        last = min(-(-(end - self.open_minute) // self.unit), self.width)
+        if last > first:
+            self.bits |= ((1 << (last - first)) - 1) << first
+
+    def free_starts(
+        self,
+        duration_minutes: int,
+        step_minutes: int,
+        earliest: int = 0,
+        latest: Optional[int] = None
+    ) -> List[int]:
+        """
+        Start times of every free slot on the grid
+
+        Args:
+            duration_minutes: Length of the slot
+            step_minutes: Spacing of the slot grid from opening time
+            earliest: Earliest allowed start time
+            latest: Latest allowed start time
+
+        Returns:
+            Slot start times in minutes since midnight, in order
+        """
+        length = -(-duration_minutes // self.unit)
+        # Bit i of runs is set when units i .. i+covered-1 are all free
+        runs = ~self.bits & self.full
+        covered = 1
+        while covered < length and runs:
+            shift = min(covered, length - covered)
+            runs &= runs >> shift
+            covered += shift
+
+        first = max(-(-(earliest - self.open_minute) // self.unit), 0)
+        last = self.width - 1
+        if latest is not None:
+            last = min(last, (latest - self.open_minute) // self.unit)
+        if last < first:
+            return []
+        runs &= ((1 << (last - first + 1)) - 1) << first
+        runs &= self._grid_mask(step_minutes // self.unit)
+
+        starts = []
+        while runs:
+            low = runs & -runs
+            starts.append(self.open_minute + (low.bit_length() - 1) * self.unit)
+            runs ^= low
+        return starts
+
+    def _grid_mask(self, stride: int) -> int:
+        mask = 0
+        for i in range(0, self.width, stride):
+            mask |= 1 << i
+        return mask
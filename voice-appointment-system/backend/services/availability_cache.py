@@ -0,0 +1,254 @@
+"""
+Availability Cache
+Per-date cache of scheduled appointments, kept current by DatabaseService writes
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from models.schemas import AppointmentResponse
+from utils.logger import app_logger
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Optional: only needed for a shared cache
+    redis = None
+
+
+class OccupancyCache:
+    """
+    Cache of each date's scheduled appointments
+
+    By default at most ``max_dates`` entries live in process memory for
+    ``ttl_seconds``, least recently used first out, and are updated in place
+    when appointments are created, changed or deleted. With ``redis_url``
+    set, entries are shared between workers through Redis instead, and
+    writes invalidate the affected dates.
+
+    The in-process cache only sees its own worker's writes, so with several
+    workers and no Redis it can report a slot as free for up to
+    ``ttl_seconds`` after another worker booked it. Treat cached results as
+    a hint: bookings re-check the database before saving.
+    """
+
+    KEY_PREFIX = "occupancy:"
+    # Writes are remembered this long so a slow load can't overwrite newer
+    # data; loads that take longer than this aren't cached at all
+    LOAD_WINDOW_SECONDS = 60
+
+    # Sets a date's entry only if its generation still matches the one read
+    # before loading, so an invalidation in between wins.
+    # KEYS: generation, entry, id keys...  ARGV: generation, ttl, payload, date
+    _PUT_SCRIPT = """
+    if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+        return 0
+    end
+    redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[2])
+    for i = 3, #KEYS do
+        redis.call('SET', KEYS[i], ARGV[4], 'EX', ARGV[2])
+    end
+    return 1
+    """
+
+    def __init__(self, ttl_seconds: int = 60, redis_url: Optional[str] = None,
+                 max_dates: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_dates = max_dates
+        self.hits = 0
+        self.misses = 0
+        # date -> (expires_at, {appointment id: appointment}), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, AppointmentResponse]]]" = OrderedDict()
+        self._dates: Dict[str, str] = {}
+        # date -> (write sequence number, monotonic time) of its last write, oldest first
+        self._writes: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._write_seq = 0
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                app_logger.error("redis is not installed; using the in-process availability cache")
+            else:
+                self._redis = redis.from_url(redis_url)
+                self._put_script = self._redis.register_script(self._PUT_SCRIPT)
+
+    async def load_token(self, *dates: str) -> Tuple[int, float, Dict[str, str]]:
+        """Take before reading these dates from the database; pass it back to put()"""
+        generations: Dict[str, str] = {}
+        if self._redis is not None and dates:
+            try:
+                values = await self._redis.mget([self._generation_key(date) for date in dates])
+                generations = {
+                    date: value.decode() if value is not None else "0"
+                    for date, value in zip(dates, values)
+                }
+            except Exception as e:
+                # Without generations nothing loaded now gets cached
+                app_logger.error(f"Error reading availability cache: {str(e)}")
+        return self._write_seq, time.monotonic(), generations
+
+    async def get(self, date: str) -> Optional[List[AppointmentResponse]]:
+        """Return the cached appointments for a date, or None"""
+        appointments = await self._get(date)
+        if appointments is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return appointments
+
+    async def put(
+        self,
+        date: str,
+        appointments: List[AppointmentResponse],
+        token: Tuple[int, float, Dict[str, str]]
+    ) -> None:
+        """Cache a date loaded from the database, unless it was written since the token was taken"""
+        seq, started, generations = token
+        if time.monotonic() - started > self.LOAD_WINDOW_SECONDS:
+            return
+        last_write = self._writes.get(date)
+        if last_write is not None and last_write[0] > seq:
+            return
+        if self._redis is not None:
+            generation = generations.get(date)
+            if generation is None:
+                return
+            try:
+                payload = json.dumps([apt.model_dump() for apt in appointments])
+                # Remember where each appointment lives so writes invalidate the right date
+                await self._put_script(
+                    keys=[self._generation_key(date), self.KEY_PREFIX + date] + [
+                        f"{self.KEY_PREFIX}id:{apt.id}" for apt in appointments
+                    ],
+                    args=[generation, self.ttl_seconds, payload, date]
+                )
+            except Exception as e:
+                app_logger.error(f"Error writing availability cache: {str(e)}")
+            return
+
+        if date in self._entries:
+            self._evict(date)
+        self._entries[date] = (
+            time.monotonic() + self.ttl_seconds,
+            {apt.id: apt for apt in appointments}
+        )
+        for apt in appointments:
+            self._dates[apt.id] = date
+        while len(self._entries) > self.max_dates:
+            self._evict(next(iter(self._entries)))
+
+    async def record_write(self, appointment: AppointmentResponse) -> None:
+        """Apply a created or updated appointment"""
+        old_date = self._dates.pop(appointment.id, None)
+        if old_date is not None:
+            entry = self._entries.get(old_date)
+            if entry is not None:
+                entry[1].pop(appointment.id, None)
+        self._bump(old_date, appointment.appointment_date)
+
+        if self._redis is not None:
+            await self._invalidate_shared(appointment.id, appointment.appointment_date)
+            return
+
+        entry = self._entries.get(appointment.appointment_date)
+        if entry is not None and appointment.status == "scheduled":
+            entry[1][appointment.id] = appointment
+            self._dates[appointment.id] = appointment.appointment_date
+
+    async def record_delete(self, appointment_id: str) -> None:
+        """Apply a deleted appointment"""
+        old_date = self._dates.pop(appointment_id, None)
+        if old_date is not None:
+            entry = self._entries.get(old_date)
+            if entry is not None:
+                entry[1].pop(appointment_id, None)
+        self._bump(old_date)
+
+        if self._redis is not None:
+            await self._invalidate_shared(appointment_id)
+
+    def clear(self) -> None:
+        """Drop all in-process entries"""
+        self._entries.clear()
+        self._dates.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for the cache"""
+        total = self.hits + self.misses
+        return {
+            "backend": "redis" if self._redis is not None else "memory",
+            "dates_cached": len(self._entries),
+            "max_dates": self.max_dates,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+    async def _get(self, date: str) -> Optional[List[AppointmentResponse]]:
+        if self._redis is not None:
+            try:
+                payload = await self._redis.get(self.KEY_PREFIX + date)
+            except Exception as e:
+                app_logger.error(f"Error reading availability cache: {str(e)}")
+                return None
+            if payload is None:
+                return None
+            return [AppointmentResponse(**apt) for apt in json.loads(payload)]
+
+        entry = self._entries.get(date)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._evict(date)
+            return None
+        self._entries.move_to_end(date)
+        return list(entry[1].values())
+
+    def _evict(self, date: str) -> None:
+        _, appointments = self._entries.pop(date)
+        for appointment_id in appointments:
+            if self._dates.get(appointment_id) == date:
+                del self._dates[appointment_id]
+
+    def _bump(self, *dates: Optional[str]) -> None:
+        now = time.monotonic()
+        for date in dates:
+            if date is not None:
+                self._write_seq += 1
+                self._writes.pop(date, None)
+                self._writes[date] = (self._write_seq, now)
+        # Forget writes no load still in the window could have started before
+        while self._writes:
+            date, (_, written_at) = next(iter(self._writes.items()))
+            if now - written_at <= self.LOAD_WINDOW_SECONDS:
+                break
+            del self._writes[date]
+
+    def _generation_key(self, date: str) -> str:
+        return f"{self.KEY_PREFIX}gen:{date}"
+
+    async def _invalidate_shared(self, appointment_id: str, date: Optional[str] = None) -> None:
+        try:
+            id_key = f"{self.KEY_PREFIX}id:{appointment_id}"
+            old_date = await self._redis.get(id_key)
+            dates = {date} if date is not None else set()
+            if old_date is not None:
+                dates.add(old_date.decode())
+            # Bump each date's generation so loads already in flight can't re-cache it;
+            # it must outlive any load put() would still accept
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.delete(id_key, *(self.KEY_PREFIX + d for d in dates))
+            for d in dates:
+                pipe.incr(self._generation_key(d))
+                pipe.expire(self._generation_key(d), self.LOAD_WINDOW_SECONDS * 2)
+            await pipe.execute()
+        except Exception as e:
+            app_logger.error(f"Error invalidating availability cache: {str(e)}")
+
+
+occupancy_cache = OccupancyCache(
+    ttl_seconds=settings.availability_cache_ttl_seconds,
+    redis_url=settings.availability_cache_redis_url or None,
+    max_dates=settings.availability_cache_max_dates
+)
@@ -5,10 +5,16 @@ Manages calendar operations for appointment scheduling
 
 from datetime import datetime, timedelta
 from config.settings import settings
+from services.availability import DayAvailability, SlotBitmap, format_minutes, parse_minutes
+from services.database_service import DatabaseService
 from utils.logger import app_logger
+from utils.metrics import instrument_service
+from typing import List, Optional
 import pytz
+import uuid
 
 
+@instrument_service("calendar")
 class CalendarService:
     """Handle Google Calendar operations"""
     
@@ -16,13 +22,21 @@ class CalendarService:
     # For now, providing mock implementation
     
     @staticmethod
-    async def check_availability(date: str, time: str) -> dict:
+    async def check_availability(
+        date: str,
+        time: str,
+        exclude_id: Optional[str] = None,
+        fresh: bool = False
+    ) -> dict:
         """
         Check if a time slot is available
         
         Args:
             date: Date in YYYY-MM-DD format
             time: Time in HH:MM format
+            exclude_id: Appointment to ignore, e.g. the one being rescheduled
+            fresh: Read the day from the database rather than the cache,
+                e.g. right before booking
         
         Returns:
             Dictionary with availability info
@@ -57,8 +71,31 @@ class CalendarService:
                     "reason": "Cannot book appointments in the past"
                 }
             
-            # TODO: Check Google Calendar for conflicts
-            # For now, all slots are available
+            # Check the appointment fits before closing
+            start = dt.hour * 60 + dt.minute
+            end = start + settings.appointment_duration_minutes
+            if end > settings.business_end_hour * 60:
+                return {
+                    "available": False,
+                    "reason": f"A {settings.appointment_duration_minutes} minute appointment at {time} would run past closing time ({settings.business_end_hour}:00)"
+                }
+            
+            # Check for conflicts with booked appointments
+            day = await CalendarService.get_day_availability(date, exclude_id, fresh)
+            if not day.is_free(start, end):
+                alternatives = await CalendarService.find_free_slots(
+                    date, time, count=3, exclude_id=exclude_id
+                )
+                reason = f"The time slot on {date} at {time} is already booked"
+                if alternatives:
+                    reason += ". The next available times are " + ", ".join(
+                        f"{slot['date']} at {slot['time']}" for slot in alternatives
+                    )
+                return {
+                    "available": False,
+                    "reason": reason,
+                    "alternatives": alternatives
+                }
             
             return {
                 "available": True,
@@ -76,13 +113,169 @@ class CalendarService:
                 "reason": "Error checking availability"
             }
     
+    @staticmethod
+    async def get_day_availability(
+        date: str,
+        exclude_id: Optional[str] = None,
+        fresh: bool = False
+    ) -> DayAvailability:
+        """
+        Load the busy intervals for a day
+        
+        Args:
+            date: Date in YYYY-MM-DD format
+            exclude_id: Appointment to leave out of the busy intervals
+            fresh: Skip the availability cache
+        
+        Returns:
+            Interval index of the day's scheduled appointments; raises if
+            they can't be loaded
+        """
+        appointments = await DatabaseService.get_appointments_by_date(date, fresh)
+        if exclude_id:
+            appointments = [apt for apt in appointments if apt.id != exclude_id]
+        return DayAvailability.from_appointments(
+            appointments,
+            settings.appointment_duration_minutes
+        )
+    
+    @staticmethod
+    async def find_free_slots(
+        date: str,
+        time: Optional[str] = None,
+        count: int = 3,
+        max_days: int = 14,
+        exclude_id: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Find the next free slots on or after a date and time
+        
+        Args:
+            date: Date in YYYY-MM-DD format
+            time: Earliest time in HH:MM format on the first day
+            count: Number of slots to return
+            max_days: Number of days to search
+            exclude_id: Appointment whose slot counts as free
+        
+        Returns:
+            List of {"date", "time"} dictionaries in chronological order
+        """
+        tz = pytz.timezone(settings.google_calendar_timezone)
+        now = datetime.now(tz)
+        first_day = datetime.strptime(date, "%Y-%m-%d").date()
+        open_minute = settings.business_start_hour * 60
+        close_minute = settings.business_end_hour * 60
+        
+        slots = []
+        for offset in range(max_days):
+            day = first_day + timedelta(days=offset)
+            if day < now.date() or day.strftime("%A") not in settings.business_days_list:
+                continue
+            
+            earliest = parse_minutes(time) if time and offset == 0 else 0
+            if day == now.date():
+                earliest = max(earliest, now.hour * 60 + now.minute + 1)
+            
+            availability = await CalendarService.get_day_availability(day.isoformat(), exclude_id)
+            for start in availability.free_slots(
+                open_minute,
+                close_minute,
+                settings.appointment_duration_minutes,
+                settings.slot_interval_minutes,
+                after=earliest
+            ):
+                slots.append({"date": day.isoformat(), "time": format_minutes(start)})
+                if len(slots) >= count:
+                    return slots
+        
+        return slots
+    
+    @staticmethod
+    async def find_slots(
+        start_date: str,
+        end_date: str,
+        preferred_days: Optional[List[str]] = None,
+        earliest_time: Optional[str] = None,
+        latest_time: Optional[str] = None,
+        count: int = 3
+    ) -> List[dict]:
+        """
+        Find the earliest free slots across a date range with a single query
+        
+        Args:
+            start_date: First date in YYYY-MM-DD format
+            end_date: Last date in YYYY-MM-DD format
+            preferred_days: Only search these day names
+            earliest_time: Earliest start time in HH:MM format
+            latest_time: Latest start time in HH:MM format
+            count: Number of slots to return
+        
+        Returns:
+            List of {"date", "day", "time"} dictionaries in chronological order
+        """
+        tz = pytz.timezone(settings.google_calendar_timezone)
+        now = datetime.now(tz)
+        first_day = max(datetime.strptime(start_date, "%Y-%m-%d").date(), now.date())
+        last_day = min(
+            datetime.strptime(end_date, "%Y-%m-%d").date(),
+            first_day + timedelta(days=settings.find_slots_max_days - 1)
+        )
+        if last_day < first_day:
+            return []
+        
+        open_minute = settings.business_start_hour * 60
+        close_minute = settings.business_end_hour * 60
+        duration = settings.appointment_duration_minutes
+        step = settings.slot_interval_minutes
+        days = [day.capitalize() for day in preferred_days] if preferred_days else settings.business_days_list
+        
+        # One bitmap per open day, filled from a single range query
+        bitmaps = {}
+        day = first_day
+        while day <= last_day:
+            day_name = day.strftime("%A")
+            if day_name in settings.business_days_list and day_name in days:
+                bitmaps[day.isoformat()] = SlotBitmap.for_grid(open_minute, close_minute, duration, step)
+            day += timedelta(days=1)
+        if not bitmaps:
+            return []
+        
+        appointments = await DatabaseService.get_appointments_between(
+            first_day.isoformat(),
+            last_day.isoformat()
+        )
+        for appointment in appointments:
+            bitmap = bitmaps.get(appointment.appointment_date)
+            if bitmap is not None:
+                start = parse_minutes(appointment.appointment_time)
+                bitmap.mark(start, start + duration)
+        
+        earliest = parse_minutes(earliest_time) if earliest_time else 0
+        latest = parse_minutes(latest_time) if latest_time else None
+        slots = []
+        for date_str in sorted(bitmaps):
+            day_earliest = earliest
+            if date_str == now.date().isoformat():
+                day_earliest = max(day_earliest, now.hour * 60 + now.minute + 1)
+            for start in bitmaps[date_str].free_starts(duration, step, day_earliest, latest):
+                slots.append({
+                    "date": date_str,
+                    "day": datetime.strptime(date_str, "%Y-%m-%d").strftime("%A"),
+                    "time": format_minutes(start)
+                })
+                if len(slots) >= count:
+                    return slots
+        
+        return slots
+    
     @staticmethod
     async def create_event(
         name: str,
         email: str,
         date: str,
         time: str,
-        service_type: str
+        service_type: str,
+        event_id: Optional[str] = None
     ) -> str:
         """
         Create a Google Calendar event
@@ -93,15 +286,16 @@ class CalendarService:
             date: Date in YYYY-MM-DD format
             time: Time in HH:MM format
             service_type: Type of service
+            event_id: ID to create the event with (see new_event_id);
+                generated if not given
         
         Returns:
-            Google Calendar event ID
+            Google Calendar event ID, or "" on failure
         """
         try:
             # TODO: Implement actual Google Calendar API call
             # Mock implementation - generate a UUID as event ID
-            import uuid
-            event_id = str(uuid.uuid4())
+            event_id = event_id or CalendarService.new_event_id()
             
             app_logger.info(
                 f"Calendar event created: {event_id} for {name} on {date} at {time}"
@@ -112,6 +306,17 @@ class CalendarService:
             app_logger.error(f"Error creating calendar event: {str(e)}")
             return ""
     
+    @staticmethod
+    def new_event_id() -> str:
+        """
+        Generate an event ID before the event exists
+        
+        Google Calendar accepts client-chosen IDs in base32hex (a-v, 0-9), so
+        an appointment row can reference its event while both are written
+        concurrently.
+        """
+        return uuid.uuid4().hex
+    
     @staticmethod
     async def update_event(
         event_id: str,
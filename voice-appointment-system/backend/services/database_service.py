@@ -1,18 +1,24 @@
 """
 Database Service - Supabase CRUD Operations
+All queries go through the pooled async REST client, so they never block the event loop
 """
 
 from config.supabase_client import supabase
 from models.schemas import AppointmentCreate, AppointmentResponse
+from services.availability_cache import occupancy_cache
 from utils.logger import app_logger
+from utils.metrics import instrument_service
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta
+import base64
 
 
+@instrument_service("database")
 class DatabaseService:
     """Handle all database operations"""
     
     TABLE_NAME = "appointments"
+    COUNT_METHODS = ("exact", "planned", "estimated")
     
     @staticmethod
     async def create_appointment(
@@ -32,12 +38,13 @@ class DatabaseService:
                 "google_calendar_event_id": google_event_id,
             }
             
-            response = supabase.table(DatabaseService.TABLE_NAME).insert(data).execute()
+            rows = await supabase.insert(DatabaseService.TABLE_NAME, data)
             
-            if response.data and len(response.data) > 0:
-                appointment = response.data[0]
-                app_logger.info(f"Appointment created: {appointment['id']}")
-                return AppointmentResponse(**appointment)
+            if rows:
+                appointment = AppointmentResponse(**rows[0])
+                app_logger.info(f"Appointment created: {appointment.id}")
+                await occupancy_cache.record_write(appointment)
+                return appointment
             
             return None
         except Exception as e:
@@ -48,12 +55,13 @@ class DatabaseService:
     async def get_appointment(appointment_id: str) -> Optional[AppointmentResponse]:
         """Get appointment by ID"""
         try:
-            response = supabase.table(DatabaseService.TABLE_NAME).select(
-                "*"
-            ).eq("id", appointment_id).execute()
+            rows = await supabase.select(
+                DatabaseService.TABLE_NAME,
+                {"id": f"eq.{appointment_id}"}
+            )
             
-            if response.data and len(response.data) > 0:
-                return AppointmentResponse(**response.data[0])
+            if rows:
+                return AppointmentResponse(**rows[0])
             return None
         except Exception as e:
             app_logger.error(f"Error getting appointment: {str(e)}")
@@ -62,27 +70,74 @@ class DatabaseService:
     @staticmethod
     async def list_appointments(
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: str = "exact"
     ) -> tuple[int, List[AppointmentResponse]]:
-        """List all appointments"""
+        """
+        List appointments, newest first
+        
+        Rows and the total are fetched in a single request. Pass the
+        page_cursor() of the last appointment on a page to get the next page
+        by keyset, which stays fast however deep the page is.
+        
+        Args:
+            limit: Page size
+            offset: Rows to skip; ignored when cursor is given
+            cursor: page_cursor() of the last appointment on the previous page
+            count: "exact", or "estimated"/"planned" to use the planner's
+                row estimate instead of counting a large table
+        
+        Returns:
+            Tuple of (total, appointments); with a cursor, total counts
+            the appointments after the cursor
+        """
         try:
-            response = supabase.table(DatabaseService.TABLE_NAME).select(
-                "*"
-            ).order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+            if count not in DatabaseService.COUNT_METHODS:
+                raise ValueError(f"Unknown count method: {count}")
             
-            # Get total count
-            count_response = supabase.table(DatabaseService.TABLE_NAME).select(
-                "id", count="exact"
-            ).execute()
+            params = {"order": "created_at.desc,id.desc", "limit": str(limit)}
+            if cursor:
+                created_at, appointment_id = DatabaseService._decode_cursor(cursor)
+                # Rows after (created_at, id); the lte bound lets the index seek
+                params["and"] = (
+                    f'(created_at.lte."{created_at}",'
+                    f'or(created_at.lt."{created_at}",id.lt."{appointment_id}"))'
+                )
+            else:
+                params["offset"] = str(offset)
             
-            total = count_response.count or 0
-            appointments = [AppointmentResponse(**apt) for apt in response.data]
+            rows, headers = await supabase.request(
+                "GET",
+                DatabaseService.TABLE_NAME,
+                params=params,
+                headers={"Prefer": f"count={count}"}
+            )
+            
+            # Content-Range: 0-49/1234
+            total = int(headers.get("Content-Range", "*/0").split("/")[-1])
+            appointments = [AppointmentResponse(**apt) for apt in rows]
             
             return total, appointments
         except Exception as e:
             app_logger.error(f"Error listing appointments: {str(e)}")
             return 0, []
     
+    @staticmethod
+    def page_cursor(appointment: AppointmentResponse) -> str:
+        """Opaque cursor that resumes listing after this appointment"""
+        key = f"{appointment.created_at}|{appointment.id}"
+        return base64.urlsafe_b64encode(key.encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[str, str]:
+        created_at, _, appointment_id = base64.urlsafe_b64decode(
+            cursor.encode()
+        ).decode().partition("|")
+        if not created_at or not appointment_id:
+            raise ValueError("Invalid cursor")
+        return created_at, appointment_id
+    
     @staticmethod
     async def update_appointment(
         appointment_id: str,
@@ -91,13 +146,17 @@ class DatabaseService:
         """Update an appointment"""
         try:
             updates["updated_at"] = datetime.now().isoformat()
-            response = supabase.table(DatabaseService.TABLE_NAME).update(
+            rows = await supabase.update(
+                DatabaseService.TABLE_NAME,
+                {"id": f"eq.{appointment_id}"},
                 updates
-            ).eq("id", appointment_id).execute()
+            )
             
-            if response.data and len(response.data) > 0:
+            if rows:
                 app_logger.info(f"Appointment updated: {appointment_id}")
-                return AppointmentResponse(**response.data[0])
+                appointment = AppointmentResponse(**rows[0])
+                await occupancy_cache.record_write(appointment)
+                return appointment
             return None
         except Exception as e:
             app_logger.error(f"Error updating appointment: {str(e)}")
@@ -107,24 +166,75 @@ class DatabaseService:
     async def delete_appointment(appointment_id: str) -> bool:
         """Delete an appointment"""
         try:
-            supabase.table(DatabaseService.TABLE_NAME).delete().eq(
-                "id", appointment_id
-            ).execute()
+            await supabase.delete(
+                DatabaseService.TABLE_NAME,
+                {"id": f"eq.{appointment_id}"}
+            )
             app_logger.info(f"Appointment deleted: {appointment_id}")
+            await occupancy_cache.record_delete(appointment_id)
             return True
         except Exception as e:
             app_logger.error(f"Error deleting appointment: {str(e)}")
             return False
     
     @staticmethod
-    async def get_appointments_by_date(date: str) -> List[AppointmentResponse]:
-        """Get all appointments for a specific date"""
+    async def get_appointments_by_date(date: str, fresh: bool = False) -> List[AppointmentResponse]:
+        """Get all appointments for a specific date; ``fresh`` skips the cache"""
         try:
-            response = supabase.table(DatabaseService.TABLE_NAME).select(
-                "*"
-            ).eq("appointment_date", date).eq("status", "scheduled").execute()
+            if not fresh:
+                cached = await occupancy_cache.get(date)
+                if cached is not None:
+                    return cached
+            
+            token = await occupancy_cache.load_token(date)
+            rows = await supabase.select(DatabaseService.TABLE_NAME, {
+                "appointment_date": f"eq.{date}",
+                "status": "eq.scheduled",
+            })
             
-            return [AppointmentResponse(**apt) for apt in response.data]
+            appointments = [AppointmentResponse(**apt) for apt in rows]
+            await occupancy_cache.put(date, appointments, token)
+            return appointments
         except Exception as e:
             app_logger.error(f"Error getting appointments by date: {str(e)}")
-            return []
+            # Re-raise so availability checks never mistake an outage for a free day
+            raise
+    
+    @staticmethod
+    async def get_appointments_between(
+        start_date: str,
+        end_date: str
+    ) -> List[AppointmentResponse]:
+        """Get all scheduled appointments from start_date to end_date inclusive"""
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end = datetime.strptime(end_date, "%Y-%m-%d").date()
+            dates = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+            
+            # Serve from the cache only if every date in the range is cached
+            appointments = []
+            for date in dates:
+                cached = await occupancy_cache.get(date)
+                if cached is None:
+                    break
+                appointments.extend(cached)
+            else:
+                return appointments
+            
+            token = await occupancy_cache.load_token(*dates)
+            rows = await supabase.select(DatabaseService.TABLE_NAME, {
+                "and": f"(appointment_date.gte.{start_date},appointment_date.lte.{end_date})",
+                "status": "eq.scheduled",
+            })
+            
+            appointments = [AppointmentResponse(**apt) for apt in rows]
+            by_date = {date: [] for date in dates}
+            for appointment in appointments:
+                by_date.setdefault(appointment.appointment_date, []).append(appointment)
+            for date in dates:
+                await occupancy_cache.put(date, by_date[date], token)
+            return appointments
+        except Exception as e:
+            app_logger.error(f"Error getting appointments between dates: {str(e)}")
+            # Re-raise so slot searches never mistake an outage for free time
+            raise
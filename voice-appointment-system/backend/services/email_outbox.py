@@ -0,0 +1,284 @@
+"""
+Email Outbox
+Durable SQLite queue of outgoing EmailJS requests, delivered by a background worker
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Set
+
+import aiohttp
+
+from utils.logger import app_logger
+
+
+class EmailOutbox:
+    """
+    Queue emails locally and deliver them in the background
+
+    enqueue() only writes the request to SQLite, so callers never wait on
+    EmailJS. The worker started by start() sends due messages over a pooled
+    HTTP session, retries failures with exponential backoff and moves
+    messages that still fail after ``max_attempts`` (or that EmailJS rejects
+    outright) to the dead-letter state. Claimed messages are leased, so a
+    message whose sender crashed is picked up again once the lease expires.
+    SQLite calls run on a dedicated thread so disk syncs and lock waits
+    never block the event loop.
+
+    Delivery is at least once. A sent message's row is deleted right after
+    EmailJS accepts it; if that delete fails, the id is kept in memory,
+    never sent again by this process, and the delete is retried before each
+    claim. Only a process that stops before the delete succeeds can send a
+    message twice.
+    """
+
+    LEASE_SECONDS = 60
+    POLL_SECONDS = 5
+    RETRY_MAX_SECONDS = 600
+
+    def __init__(
+        self,
+        path: str,
+        url: str,
+        max_attempts: int = 8,
+        concurrency: int = 4,
+        timeout_seconds: float = 10,
+        retry_base_seconds: float = 5
+    ):
+        self.path = path
+        self.url = url
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.timeout_seconds = timeout_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.sent = 0
+        self.failed_attempts = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY, payload TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+            "last_error TEXT, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at)"
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        # Sent messages whose row couldn't be deleted yet
+        self._undeleted: Set[int] = set()
+        # One thread, so statements never interleave on the shared connection
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-outbox")
+
+    async def _call(self, func: Callable, *args):
+        """Run a SQLite call on the outbox's database thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._db, func, *args)
+
+    async def enqueue(self, payload: dict) -> int:
+        """Store a message for delivery and wake the worker; returns its id"""
+        message_id = await self._call(self._insert, json.dumps(payload))
+        if self._wake is not None:
+            self._wake.set()
+        return message_id
+
+    def start(self) -> None:
+        """Start the delivery worker on the running event loop"""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker; undelivered messages stay queued for next start"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def run_once(self) -> int:
+        """Deliver the messages that are due now; returns how many were attempted"""
+        if self._undeleted:
+            await self._call(self._delete_many, list(self._undeleted))
+            self._undeleted.clear()
+        messages = await self._call(self._claim, self.concurrency)
+        messages = [message for message in messages if message[0] not in self._undeleted]
+        if messages:
+            await asyncio.gather(*(self._deliver(*message) for message in messages))
+        return len(messages)
+
+    async def dead_letters(self, limit: int = 50) -> List[dict]:
+        """Messages that were given up on, newest first"""
+        return await self._call(self._dead_letters, limit)
+
+    async def retry_dead(self) -> int:
+        """Queue every dead-lettered message again; returns how many"""
+        count = await self._call(self._retry_dead)
+        if self._wake is not None:
+            self._wake.set()
+        return count
+
+    async def stats(self) -> dict:
+        """Queue depth and delivery counters"""
+        stats = await self._call(self._queue_stats)
+        stats.update({
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "worker_running": self._task is not None and not self._task.done(),
+        })
+        return stats
+
+    def _insert(self, payload: str) -> int:
+        now = time.time()
+        cursor = self._conn.execute(
+            "INSERT INTO outbox (payload, next_attempt_at, created_at) VALUES (?, ?, ?)",
+            (payload, now, now)
+        )
+        return cursor.lastrowid
+
+    def _dead_letters(self, limit: int) -> List[dict]:
+        rows = self._conn.execute(
+            "SELECT id, payload, attempts, last_error, created_at FROM outbox "
+            "WHERE status = 'dead' ORDER BY id DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [
+            {"id": row[0], "payload": json.loads(row[1]), "attempts": row[2],
+             "last_error": row[3], "created_at": row[4]}
+            for row in rows
+        ]
+
+    def _retry_dead(self) -> int:
+        cursor = self._conn.execute(
+            "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ? "
+            "WHERE status = 'dead'",
+            (time.time(),)
+        )
+        return cursor.rowcount
+
+    def _queue_stats(self) -> dict:
+        counts = dict(self._conn.execute(
+            "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+        ).fetchall())
+        oldest = self._conn.execute(
+            "SELECT MIN(created_at) FROM outbox WHERE status = 'pending'"
+        ).fetchone()[0]
+        return {
+            "pending": counts.get("pending", 0),
+            "dead": counts.get("dead", 0),
+            "oldest_pending_seconds": round(time.time() - oldest, 1) if oldest else None,
+        }
+
+    def _next_due(self) -> Optional[float]:
+        return self._conn.execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+        ).fetchone()[0]
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                attempted = await self.run_once()
+            except Exception as e:
+                app_logger.error(f"Email outbox worker error: {str(e)}")
+                attempted = 0
+            if not attempted:
+                # Sleep until the next retry is due, a new message arrives or the poll interval passes
+                try:
+                    next_due = await self._call(self._next_due)
+                except Exception as e:
+                    app_logger.error(f"Email outbox worker error: {str(e)}")
+                    next_due = None
+                timeout = self.POLL_SECONDS
+                if next_due is not None:
+                    timeout = min(max(next_due - time.time(), 0), timeout)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _claim(self, limit: int) -> list:
+        now = time.time()
+        # BEGIN IMMEDIATE so workers in other processes can't claim the same rows
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._conn.execute(
+                "SELECT id, payload, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+                [(now + self.LEASE_SECONDS, row[0]) for row in rows]
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [(row[0], json.loads(row[1]), row[2] + 1) for row in rows]
+
+    async def _deliver(self, message_id: int, payload: dict, attempt: int) -> None:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+            )
+        permanent = False
+        try:
+            async with self._session.post(
+                self.url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds)
+            ) as response:
+                if response.status == 200:
+                    self.sent += 1
+                    app_logger.info(f"Email {message_id} sent successfully")
+                    await self._forget(message_id)
+                    return
+                error = f"{response.status} - {await response.text()}"
+                # Other 4xx responses mean the request itself is bad; retrying won't help
+                permanent = 400 <= response.status < 500 and response.status not in (408, 429)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        self.failed_attempts += 1
+        if permanent or attempt >= self.max_attempts:
+            await self._call(self._mark_dead, message_id, error)
+            app_logger.error(f"Email {message_id} dead-lettered after {attempt} attempts: {error}")
+        else:
+            delay = min(self.retry_base_seconds * 2 ** (attempt - 1), self.RETRY_MAX_SECONDS)
+            await self._call(self._schedule_retry, message_id, time.time() + delay, error)
+            app_logger.error(f"Email {message_id} failed (attempt {attempt}), retrying in {delay:.0f}s: {error}")
+
+    async def _forget(self, message_id: int) -> None:
+        """Delete a sent message; if that fails, keep it from being sent again"""
+        try:
+            await self._call(self._delete_many, [message_id])
+        except Exception as e:
+            self._undeleted.add(message_id)
+            app_logger.error(f"Email {message_id} was sent but its outbox row wasn't deleted: {str(e)}")
+
+    def _delete_many(self, message_ids: List[int]) -> None:
+        self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in message_ids])
+
+    def _mark_dead(self, message_id: int, error: str) -> None:
+        self._conn.execute(
+            "UPDATE outbox SET status = 'dead', last_error = ? WHERE id = ?",
+            (error, message_id)
+        )
+
+    def _schedule_retry(self, message_id: int, next_attempt_at: float, error: str) -> None:
+        self._conn.execute(
+            "UPDATE outbox SET next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (next_attempt_at, error, message_id)
+        )
@@ -1,24 +1,21 @@
 """
-Email Service - EmailJS Integration with Retry Logic
+Email Service - EmailJS Integration via a Durable Outbox
 """
 
-import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
 from config.settings import settings
+from services.email_outbox import EmailOutbox
 from utils.logger import app_logger
+from utils.metrics import instrument_service
 from typing import Optional
 
 
+@instrument_service("email")
 class EmailService:
-    """Handle email sending via EmailJS with retry logic"""
+    """Handle email sending via EmailJS; delivery and retries run in the background"""
     
     EMAILJS_API_URL = "https://api.emailjs.com/api/v1.0/email/send"
     
     @staticmethod
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     async def send_email(
         to_email: str,
         to_name: str,
@@ -27,7 +24,10 @@ class EmailService:
         **template_params
     ) -> bool:
         """
-        Send email via EmailJS
+        Queue an email for delivery via EmailJS
+        
+        The message is written to the local outbox and sent by its worker,
+        so this returns without waiting on EmailJS.
         
         Args:
             to_email: Recipient email
@@ -37,7 +37,7 @@ class EmailService:
             **template_params: Additional template parameters
         
         Returns:
-            True if successful, False otherwise
+            True if queued, False otherwise
         """
         try:
             payload = {
@@ -53,25 +53,12 @@ class EmailService:
                 }
             }
             
-            response = requests.post(
-                EmailService.EMAILJS_API_URL,
-                json=payload,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                app_logger.info(
-                    f"Email sent successfully to {to_email}",
-                )
-                return True
-            else:
-                app_logger.error(
-                    f"Email sending failed: {response.status_code} - {response.text}"
-                )
-                return False
+            message_id = await email_outbox.enqueue(payload)
+            app_logger.info(f"Email {message_id} queued for {to_email}")
+            return True
         except Exception as e:
-            app_logger.error(f"Error sending email: {str(e)}")
-            raise
+            app_logger.error(f"Error queueing email: {str(e)}")
+            return False
     
     @staticmethod
     async def send_booking_confirmation(
@@ -154,3 +141,11 @@ class EmailService:
             practice_phone="+27 (0)123 456 7890",
             business_hours="Monday-Friday: 8AM-6PM, Saturday: 9AM-1PM"
         )
+
+
+email_outbox = EmailOutbox(
+    settings.email_outbox_path,
+    EmailService.EMAILJS_API_URL,
+    max_attempts=settings.email_max_attempts,
+    concurrency=settings.email_worker_concurrency
+)
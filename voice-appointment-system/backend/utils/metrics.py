@@ -0,0 +1,298 @@
+"""
+Metrics
+In-process counters, gauges and histograms exposed in the Prometheus text format
+"""
+
+import functools
+import inspect
+import logging
+from bisect import bisect_left
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Request and call durations in seconds, from cache hits to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Series:
+    """One labelled value; bind it once with labels() to skip the lookup per update"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Counter:
+    """
+    Monotonic count per label combination
+
+    Label values are passed positionally in ``labelnames`` order. Updates
+    aren't locked: they only happen on the event loop thread.
+    """
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+
+    def labels(self, *labels: str) -> _Series:
+        """The series for these label values, created on first use"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series()
+        return series
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Add ``amount`` to the series for these label values"""
+        self.labels(*labels).value += amount
+
+    def value(self, *labels: str) -> float:
+        """Current value of one series"""
+        series = self._series.get(labels)
+        return series.value if series else 0.0
+
+    def samples(self) -> Iterator[Tuple[str, Tuple[str, ...], Tuple[str, ...], float]]:
+        """(suffix, label names, label values, value) for every series"""
+        for labels, series in sorted(self._series.items()):
+            yield "", self.labelnames, labels, series.value
+
+
+class Gauge(Counter):
+    """Value per label combination that can go up and down"""
+
+    TYPE = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        """Subtract ``amount`` from the series for these label values"""
+        self.labels(*labels).value -= amount
+
+    def set(self, *labels: str, value: float) -> None:
+        """Replace the series for these label values"""
+        self.labels(*labels).value = value
+
+
+class _HistogramSeries:
+    """One labelled distribution: a count per bucket plus +Inf (not cumulative), and the sum"""
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram:
+    """Bucketed distribution per label combination, with sum and count"""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+
+    def labels(self, *labels: str) -> _HistogramSeries:
+        """The series for these label values, created on first use"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(self.buckets)
+        return series
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for these label values"""
+        self.labels(*labels).observe(value)
+
+    def count(self, *labels: str) -> int:
+        """Number of observations in one series"""
+        series = self._series.get(labels)
+        return sum(series.counts) if series else 0
+
+    def samples(self) -> Iterator[Tuple[str, Tuple[str, ...], Tuple[str, ...], float]]:
+        """(suffix, label names, label values, value) for every series"""
+        bucket_names = self.labelnames + ("le",)
+        bounds = self.buckets + (float("inf"),)
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series.counts):
+                cumulative += count
+                yield "_bucket", bucket_names, labels + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, labels, series.sum
+            yield "_count", self.labelnames, labels, cumulative
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for a scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        """Create and register a gauge"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Create and register a histogram"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for suffix, names, values, value in metric.samples():
+                labels = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+                series = f"{metric.name}{suffix}{{{labels}}}" if labels else f"{metric.name}{suffix}"
+                lines.append(f"{series} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class ErrorCounter(logging.Handler):
+    """Count ERROR log records per module; services log failures rather than raise"""
+
+    def __init__(self, counter: Counter):
+        super().__init__(level=logging.ERROR)
+        self.counter = counter
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.counter.inc(record.module)
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code",
+    ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request duration in seconds",
+    ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+service_call_duration_seconds = registry.histogram(
+    "service_call_duration_seconds", "Service call duration in seconds",
+    ("service", "method")
+)
+service_calls_in_flight = registry.gauge(
+    "service_calls_in_flight", "Service calls currently awaiting",
+    ("service",)
+)
+service_call_exceptions_total = registry.counter(
+    "service_call_exceptions_total", "Service calls that raised",
+    ("service", "method", "exception")
+)
+log_errors_total = registry.counter(
+    "log_errors_total", "ERROR log records by module",
+    ("module",)
+)
+tool_step_duration_seconds = registry.histogram(
+    "tool_step_duration_seconds", "Duration of each step of a voice tool in seconds",
+    ("tool", "step")
+)
+
+
+async def timed_step(tool: str, step: str, awaitable: Awaitable[T]) -> T:
+    """Await one step of a tool, recording its duration; concurrent steps are timed separately"""
+    started = perf_counter()
+    try:
+        return await awaitable
+    finally:
+        tool_step_duration_seconds.observe(perf_counter() - started, tool, step)
+
+
+def timed_call(service: str, method: Optional[str] = None) -> Callable:
+    """
+    Decorator recording duration, in-flight count and exceptions of an async call
+
+    Args:
+        service: Service label, e.g. "database"
+        method: Method label; defaults to the function name
+    """
+    def decorator(func):
+        name = method or func.__name__
+        in_flight = service_calls_in_flight.labels(service)
+        duration = service_call_duration_seconds.labels(service, name)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            in_flight.value += 1
+            started = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                service_call_exceptions_total.inc(service, name, type(e).__name__)
+                raise
+            finally:
+                duration.observe(perf_counter() - started)
+                in_flight.value -= 1
+        return wrapper
+    return decorator
+
+
+def instrument_service(service: str) -> Callable:
+    """Class decorator applying timed_call to every public async static method"""
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if (
+                isinstance(value, staticmethod)
+                and not attr.startswith("_")
+                and inspect.iscoroutinefunction(value.__func__)
+            ):
+                setattr(cls, attr, staticmethod(timed_call(service)(value.__func__)))
+        return cls
+    return decorator
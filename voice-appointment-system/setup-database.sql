@@ -21,7 +21,9 @@ CREATE TABLE IF NOT EXISTS appointments (
 CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(appointment_date);
 CREATE INDEX IF NOT EXISTS idx_appointments_status ON appointments(status);
 CREATE INDEX IF NOT EXISTS idx_appointments_email ON appointments(customer_email);
-CREATE INDEX IF NOT EXISTS idx_appointments_created ON appointments(created_at DESC);
+-- Newest-first listing pages by (created_at, id); see DatabaseService.list_appointments
+DROP INDEX IF EXISTS idx_appointments_created;
+CREATE INDEX IF NOT EXISTS idx_appointments_created_id ON appointments(created_at DESC, id DESC);
 
 -- Enable Row Level Security
 ALTER TABLE appointments ENABLE ROW LEVEL SECURITY;